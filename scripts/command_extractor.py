@@ -6,8 +6,125 @@ Command extractor for discovering all available bot commands from Rust source.
 import re
 import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, NamedTuple, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+# Patterns are compiled once at import time and shared by every parse pass.
+_COMMANDS_VEC_START = 'let mut commands = vec!['
+_COMMANDS_VEC_END = '];'
+_CMD_REGISTER_PAT = re.compile(r'(\w+)::(\w+)\(\)')
+# Command attrs may hold one level of nested calls, e.g. aliases("a"), and
+# quoted strings; bounding the classes keeps matching linear instead of
+# backtracking through lazy DOTALL wildcards. The fn signature must follow
+# the attribute before any `{` outside comments and string literals (doc
+# comments and other attributes may sit in between), so a match never
+# spills into the next body.
+_ATTRS = r'((?:[^()"]|"[^"]*"|\((?:[^()"]|"[^"]*")*\))*)'
+# Each alternative starts on a different character and has one possible end
+# (a line comment always runs to the end of its line), so failed matches
+# don't backtrack through alternative splits of the same text
+_GAP = r'(?:[^{/"]|/(?![/*])|//[^\n]*(?![^\n])|/\*(?:[^*]|\*(?!/))*\*/|"(?:[^"\\]|\\.)*")*?'
+_PUB_CMD_PAT = re.compile(r'#\[poise::command\(' + _ATTRS + r'\)\]' + _GAP + r'pub async fn (\w+)')
+_PUB_CMD_CALL_PAT = re.compile(r'#\[poise::command\(' + _ATTRS + r'\)\]' + _GAP + r'pub async fn (\w+)\(')
+_CMD_PAT = re.compile(r'#\[poise::command\(' + _ATTRS + r'\)\]' + _GAP + r'(?:pub )?async fn (\w+)')
+_DESC_ANY_PAT = re.compile(
+    r'description_localized\s*\(\s*"en-US"\s*,\s*"(?P<loc>[^"]+)"\s*\)'
+    r'|description\s*=\s*"(?P<eq>[^"]+)"',
+    re.DOTALL,
+)
+_PARAM_DESC_PAT = re.compile(r'#\[description\s*=\s*"([^"]+)"\]')
+_ALIASES_PAT = re.compile(r'aliases\s*\(([^)]*)\)')
+_SUBCMDS_PAT = re.compile(r'subcommands\s*\(([^)]*)\)')
+_FLAGS_PAT = re.compile(r'prefix_command|slash_command')
+# Bytes every command file must contain; checked before decoding or regex work
+_CMD_MARKER = b'#[poise::command('
+_RENAME_PAT = re.compile(r'rename\s*=\s*"([^"]+)"')
+# One name from a comma-separated, optionally quoted list, e.g. aliases("a", "b")
+_TOKEN_PAT = re.compile(r'[^\s,"\']+')
+
+# Below this many command files/modules a process pool costs more than it saves
+_PARALLEL_MIN_TASKS = 16
+_PARALLEL_CHUNKSIZE = 8
+
+
+def _tokens(text: str) -> List[str]:
+    """Split a name list, interning names since they recur as dict keys and values."""
+    return [sys.intern(token) for token in _TOKEN_PAT.findall(text)]
+
+
+class _ParsedAttrs(NamedTuple):
+    """Fields read from one `#[poise::command(...)]` attribute block."""
+    description: str
+    aliases: Tuple[str, ...]
+    subcommands: Tuple[str, ...]
+    supports_prefix: bool
+    supports_slash: bool
+
+
+def _attr_description(attrs: str) -> str:
+    """Read the command description, slicing plain `description = "..."` directly."""
+    if 'description_localized' not in attrs:
+        _, key, tail = attrs.partition('description')
+        if not key:
+            return ''
+        before, quote, rest = tail.partition('"')
+        value, closing, _ = rest.partition('"')
+        if quote and closing and value and before.strip() == '=':
+            return value
+    
+    # Localized descriptions and unusual layouts go through the regex
+    desc_match = _DESC_ANY_PAT.search(attrs)
+    return (desc_match.group('loc') or desc_match.group('eq')) if desc_match else ''
+
+
+@lru_cache(maxsize=4096)
+def _parse_attrs(attrs: str) -> _ParsedAttrs:
+    """Parse a command attribute block; identical blocks share one result."""
+    aliases_match = _ALIASES_PAT.search(attrs)
+    subcmds_match = _SUBCMDS_PAT.search(attrs)
+    flags = set(_FLAGS_PAT.findall(attrs))
+    return _ParsedAttrs(
+        description=_attr_description(attrs),
+        aliases=tuple(_tokens(aliases_match.group(1))) if aliases_match else (),
+        subcommands=tuple(_tokens(subcmds_match.group(1))) if subcmds_match else (),
+        supports_prefix='prefix_command' in flags,
+        supports_slash='slash_command' in flags,
+    )
+
+
+@lru_cache(maxsize=256)
+def _read(path_str: str) -> bytes:
+    """Read a source file, caching its raw bytes for the rest of the pass."""
+    return Path(path_str).read_bytes()
+
+
+def _parse_command_path(task: Tuple[str, str, bool, Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    """Parse one command module or file in a worker process.
+
+    The worker seeds a fresh extractor with the command's framework entry and
+    returns the updated entry for the parent process to merge.
+    """
+    src_path, path, is_module, entry = task
+    item = Path(path)
+    name = item.name if is_module else item.stem
+
+    extractor = CommandExtractor(src_path)
+    extractor.commands[name] = entry
+    if is_module:
+        extractor._parse_command_module(item)
+    else:
+        extractor._parse_single_command(item)
+
+    return name, extractor.commands[name]
+
 
 class CommandExtractor:
     def __init__(self, src_path: str = "src"):
@@ -25,24 +142,27 @@ class CommandExtractor:
         commands_dir = self.src_path / "commands"
         if commands_dir.exists():
             self._parse_command_files(commands_dir)
-            
+        
+        # Sources may change before the next pass; don't hold them in memory
+        _read.cache_clear()
+        
         return self.commands
     
     def _parse_framework(self, file_path: Path):
         """Parse framework.rs to get registered commands."""
-        with open(file_path, 'r') as f:
-            content = f.read()
-            
-        # Find the commands vector
-        commands_pattern = r'let mut commands = vec!\[(.*?)\];'
-        match = re.search(commands_pattern, content, re.DOTALL)
+        content = _read(str(file_path)).decode('utf-8')
         
-        if match:
-            commands_text = match.group(1)
+        # Find the commands vector with plain substring searches
+        start = content.find(_COMMANDS_VEC_START)
+        if start < 0:
+            return
+        start += len(_COMMANDS_VEC_START)
+        end = content.find(_COMMANDS_VEC_END, start)
+        
+        if end >= 0:
             # Extract command registrations like ping::ping()
-            cmd_pattern = r'(\w+)::(\w+)\(\)'
-            for match in re.finditer(cmd_pattern, commands_text):
-                module, func = match.groups()
+            for match in _CMD_REGISTER_PAT.finditer(content, start, end):
+                module, func = map(sys.intern, match.groups())
                 self.commands[module] = {
                     'name': module,
                     'function': func,
@@ -53,91 +173,110 @@ class CommandExtractor:
     
     def _parse_command_files(self, commands_dir: Path):
         """Parse individual command files for details."""
-        for item in commands_dir.iterdir():
-            if item.is_dir():
-                # Handle command modules with subcommands
-                self._parse_command_module(item)
-            elif item.suffix == '.rs' and item.stem != 'mod':
-                # Handle single command files
-                self._parse_single_command(item)
+        # (path, is_module, command name); DirEntry caches the file type from
+        # readdir, avoiding a stat per entry
+        tasks = []
+        with os.scandir(commands_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Command modules with subcommands
+                    tasks.append((entry.path, True, entry.name))
+                elif entry.name.endswith('.rs') and entry.name != 'mod.rs':
+                    # Single command files
+                    tasks.append((entry.path, False, entry.name[:-3]))
+        
+        if len(tasks) < _PARALLEL_MIN_TASKS:
+            for path, is_module, _ in tasks:
+                if is_module:
+                    self._parse_command_module(Path(path))
+                else:
+                    self._parse_single_command(Path(path))
+            return
+        
+        # Each file only updates its own registered command, so files parse
+        # independently and results merge back here
+        jobs = [
+            (str(self.src_path), path, is_module, self.commands[name])
+            for path, is_module, name in tasks
+            if name in self.commands
+        ]
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            for name, entry in pool.map(_parse_command_path, jobs, chunksize=_PARALLEL_CHUNKSIZE):
+                self.commands[name] = entry
     
     def _parse_command_module(self, module_dir: Path):
         """Parse a command module directory (e.g., boosterrole/)."""
         module_name = module_dir.name
         
+        # Only modules registered in framework.rs are recorded
+        command = self.commands.get(module_name)
+        if command is None:
+            return
+        
+        # List the module once so file checks are set lookups, not stats
+        with os.scandir(module_dir) as entries:
+            module_files = {entry.name for entry in entries}
+        
         # Parse mod.rs for the main command
         mod_file = module_dir / "mod.rs"
-        if mod_file.exists():
-            with open(mod_file, 'r') as f:
-                content = f.read()
+        if "mod.rs" in module_files:
+            raw = _read(str(mod_file))
                 
-            # Find main command definition
-            cmd_pattern = r'#\[poise::command\((.*?)\)\].*?pub async fn (\w+)'
-            match = re.search(cmd_pattern, content, re.DOTALL)
+            # Find main command definition, skipping files without the macro
+            match = None
+            if _CMD_MARKER in raw:
+                match = _PUB_CMD_PAT.search(raw.decode('utf-8'))
             
             if match:
                 attrs, func_name = match.groups()
                 
                 # Parse attributes
-                desc_match = re.search(r'description_localized.*?"en-US".*?"([^"]+)"', attrs)
-                if not desc_match:
-                    desc_match = re.search(r'description\s*=\s*"([^"]+)"', attrs)
-                
-                aliases_match = re.search(r'aliases\((.*?)\)', attrs)
-                aliases = []
-                if aliases_match:
-                    aliases = [a.strip().strip('"') for a in aliases_match.group(1).split(',')]
-                
-                # Check prefix/slash support
-                supports_prefix = 'prefix_command' in attrs
-                supports_slash = 'slash_command' in attrs
+                parsed = _parse_attrs(attrs)
                 
-                if module_name in self.commands:
-                    self.commands[module_name]['description'] = desc_match.group(1) if desc_match else ''
-                    self.commands[module_name]['aliases'] = aliases
-                    self.commands[module_name]['supports_prefix'] = supports_prefix
-                    self.commands[module_name]['supports_slash'] = supports_slash
+                command['description'] = parsed.description
+                command['aliases'] = list(parsed.aliases)
+                command['supports_prefix'] = parsed.supports_prefix
+                command['supports_slash'] = parsed.supports_slash
                 
-                # Find subcommands
-                subcommand_pattern = r'subcommands\((.*?)\)'
-                subcommand_match = re.search(subcommand_pattern, attrs, re.DOTALL)
-                if subcommand_match:
-                    subcmds_text = subcommand_match.group(1)
-                    # Clean up and split by comma, handling multi-line
-                    subcmds_text = re.sub(r'\s+', ' ', subcmds_text)
-                    subcmd_names = [s.strip().strip('"') for s in subcmds_text.split(',') if s.strip()]
-                    
-                    # Parse each subcommand file
-                    for subcmd in subcmd_names:
-                        subcmd_file = module_dir / f"{subcmd}.rs"
-                        if subcmd_file.exists():
-                            self._parse_subcommand(module_name, subcmd, subcmd_file)
+                # Parse each subcommand file
+                for subcmd in parsed.subcommands:
+                    subcmd_filename = f"{subcmd}.rs"
+                    if subcmd_filename in module_files:
+                        self._parse_subcommand(module_name, subcmd, module_dir / subcmd_filename)
     
     def _parse_subcommand(self, parent_cmd: str, subcmd_name: str, file_path: Path):
         """Parse a subcommand file."""
-        with open(file_path, 'r') as f:
-            content = f.read()
+        parent_entry = self.commands.get(parent_cmd)
+        if parent_entry is None:
+            return
+        parent_subcommands = parent_entry['subcommands']
+        
+        raw = _read(str(file_path))
+        if _CMD_MARKER not in raw:
+            return
+        content = raw.decode('utf-8')
         
-        # Find all command definitions in the file
-        cmd_pattern = r'#\[poise::command\((.*?)\)\].*?(?:pub )?async fn (\w+)'
-        matches = list(re.finditer(cmd_pattern, content, re.DOTALL))
+        # Find all command definitions in the file, indexed by function name
+        # as (attrs, func_name, start) tuples rather than retained Match objects.
+        # A name defined twice (e.g. behind #[cfg]) resolves as the file-order
+        # scans did: parent and plain lookups stop at the first definition,
+        # while the nested scan let a later one overwrite it.
+        entries = [(m.group(1), m.group(2), m.start()) for m in _CMD_PAT.finditer(content)]
+        by_name = {}
+        for attrs, func_name, start in entries:
+            by_name.setdefault(func_name, (attrs, start))
+        last_by_name = {func_name: (attrs, start) for attrs, func_name, start in entries}
         
         # Look for the main subcommand function
         main_func = None
         sub_subcommands = []
         
-        for match in matches:
-            attrs, func_name = match.groups()
-            
+        for attrs, func_name, _ in entries:
             # Check if this has nested subcommands
-            if 'subcommands(' in attrs:
+            nested = _parse_attrs(attrs).subcommands
+            if nested:
                 main_func = func_name
-                # Extract nested subcommand names
-                subcmd_match = re.search(r'subcommands\((.*?)\)', attrs, re.DOTALL)
-                if subcmd_match:
-                    subcmds_text = subcmd_match.group(1)
-                    subcmds_text = re.sub(r'\s+', ' ', subcmds_text)
-                    sub_subcommands = [s.strip().strip('"') for s in subcmds_text.split(',') if s.strip()]
+                sub_subcommands = nested
         
         # If there are nested subcommands, use those instead
         if sub_subcommands:
@@ -146,92 +285,71 @@ class CommandExtractor:
             parent_desc = ""
             parent_aliases = []
             
-            # Find the main function that defines the parent subcommand
-            for match in matches:
-                attrs, func_name = match.groups()
-                # Match either the main_func or the subcmd_name itself (for cases where they're the same)
-                if func_name == main_func or func_name == subcmd_name:
-                    parent_desc = self._extract_description(attrs, content, match.start())
-                    aliases_match = re.search(r'aliases\((.*?)\)', attrs)
-                    if aliases_match:
-                        aliases_text = aliases_match.group(1)
-                        parent_aliases = [a.strip().strip('"') for a in aliases_text.split(',') if a.strip()]
-                    break
+            # Find the main function that defines the parent subcommand: the first
+            # in file order named either main_func or subcmd_name (for cases where
+            # they're the same)
+            found = [by_name[name] for name in (main_func, subcmd_name) if name in by_name]
+            entry = min(found, key=lambda e: e[1], default=None)
+            if entry:
+                attrs, start = entry
+                parent_desc = self._extract_description(attrs, content, start)
+                parent_aliases = list(_parse_attrs(attrs).aliases)
             
             # Add parent subcommand entry
-            if parent_cmd in self.commands:
-                self.commands[parent_cmd]['subcommands'][subcmd_name] = {
-                    'name': subcmd_name,
-                    'description': parent_desc,
-                    'aliases': parent_aliases
-                }
+            parent_subcommands[subcmd_name] = {
+                'name': subcmd_name,
+                'description': parent_desc,
+                'aliases': parent_aliases
+            }
             
             # Then add the nested subcommands
             for sub_subcmd in sub_subcommands:
                 # Find the function definition for this sub-subcommand
-                for match in matches:
-                    attrs, func_name = match.groups()
-                    if func_name == sub_subcmd:
-                        # Parse description from parameter attributes or command attributes
-                        desc = self._extract_description(attrs, content, match.start())
-                        
-                        # Parse aliases
-                        aliases_match = re.search(r'aliases\((.*?)\)', attrs)
-                        aliases = []
-                        if aliases_match:
-                            aliases_text = aliases_match.group(1)
-                            aliases = [a.strip().strip('"') for a in aliases_text.split(',') if a.strip()]
-                        
-                        # Store as nested subcommand
-                        nested_name = f"{subcmd_name} {sub_subcmd}"
-                        if parent_cmd in self.commands:
-                            self.commands[parent_cmd]['subcommands'][nested_name] = {
-                                'name': nested_name,
-                                'description': desc,
-                                'aliases': aliases,
-                                'parent_subcommand': subcmd_name
-                            }
-        else:
-            # Regular subcommand without nesting
-            for match in matches:
-                attrs, func_name = match.groups()
-                if func_name == subcmd_name:
-                    desc = self._extract_description(attrs, content, match.start())
+                entry = last_by_name.get(sub_subcmd)
+                if entry:
+                    attrs, start = entry
+                    # Parse description from parameter attributes or command attributes
+                    desc = self._extract_description(attrs, content, start)
                     
                     # Parse aliases
-                    aliases_match = re.search(r'aliases\((.*?)\)', attrs)
-                    aliases = []
-                    if aliases_match:
-                        aliases_text = aliases_match.group(1)
-                        aliases = [a.strip().strip('"') for a in aliases_text.split(',') if a.strip()]
+                    aliases = list(_parse_attrs(attrs).aliases)
                     
-                    # Add to parent command
-                    if parent_cmd in self.commands:
-                        self.commands[parent_cmd]['subcommands'][subcmd_name] = {
-                            'name': subcmd_name,
-                            'description': desc,
-                            'aliases': aliases
-                        }
-                    break
+                    # Store as nested subcommand
+                    nested_name = f"{subcmd_name} {sub_subcmd}"
+                    parent_subcommands[nested_name] = {
+                        'name': nested_name,
+                        'description': desc,
+                        'aliases': aliases,
+                        'parent_subcommand': subcmd_name
+                    }
+        else:
+            # Regular subcommand without nesting
+            entry = by_name.get(subcmd_name)
+            if entry:
+                attrs, start = entry
+                desc = self._extract_description(attrs, content, start)
+                
+                # Parse aliases
+                aliases = list(_parse_attrs(attrs).aliases)
+                
+                # Add to parent command
+                parent_subcommands[subcmd_name] = {
+                    'name': subcmd_name,
+                    'description': desc,
+                    'aliases': aliases
+                }
     
     def _extract_description(self, attrs: str, content: str, position: int) -> str:
         """Extract description from various sources."""
-        # Try description_localized first (handle multiline)
-        # Look for the pattern: description_localized(\n        "en-US",\n        "DESCRIPTION"\n    )
-        desc_match = re.search(r'description_localized\s*\(\s*"en-US"\s*,\s*"([^"]+)"\s*\)', attrs, re.DOTALL)
-        if desc_match:
-            return desc_match.group(1)
-        
-        # Try regular description attribute
-        desc_match = re.search(r'description\s*=\s*"([^"]+)"', attrs)
-        if desc_match:
-            return desc_match.group(1)
+        # Try description_localized (handle multiline) or a regular description attribute
+        description = _parse_attrs(attrs).description
+        if description:
+            return description
         
         # Look for #[description = "..."] in function parameters
         func_end = content.find('{', position)
         if func_end > 0:
-            func_section = content[position:func_end]
-            param_desc = re.search(r'#\[description\s*=\s*"([^"]+)"\]', func_section)
+            param_desc = _PARAM_DESC_PAT.search(content, position, func_end)
             if param_desc:
                 return param_desc.group(1)
         
@@ -241,109 +359,77 @@ class CommandExtractor:
         """Parse a single command file."""
         cmd_name = file_path.stem
         
-        with open(file_path, 'r') as f:
-            content = f.read()
+        # Only commands registered in framework.rs are recorded
+        command = self.commands.get(cmd_name)
+        if command is None:
+            return
+        
+        raw = _read(str(file_path))
+        if _CMD_MARKER not in raw:
+            return
+        content = raw.decode('utf-8')
         
         # Find command definition
-        cmd_pattern = r'#\[poise::command\((.*?)\)\].*?pub async fn (\w+)'
-        match = re.search(cmd_pattern, content, re.DOTALL)
+        match = _PUB_CMD_PAT.search(content)
         
         if match:
             attrs, func_name = match.groups()
             
-            # Parse description
-            desc_match = re.search(r'description_localized.*?"en-US".*?"([^"]+)"', attrs)
-            if not desc_match:
-                desc_match = re.search(r'description\s*=\s*"([^"]+)"', attrs)
+            # Parse description, subcommands, aliases and prefix/slash support
+            parsed = _parse_attrs(attrs)
+            subcommands = parsed.subcommands
             
-            # Parse subcommands
-            subcommands = []
-            subcommand_match = re.search(r'subcommands\s*\(\s*([^)]+)\s*\)', attrs)
-            if subcommand_match:
-                subcmds_text = subcommand_match.group(1)
-                subcommands = [s.strip().strip('"').strip("'") for s in subcmds_text.split(',')]
+            # Update command info
+            command['description'] = parsed.description
+            if subcommands:
+                # Index every command block once by function name and by
+                # rename = "..." target; the first block in file order wins
+                subcmd_index = {}
+                for subcmd_match in _PUB_CMD_CALL_PAT.finditer(content):
+                    subcmd_attrs, func_name = subcmd_match.groups()
+                    subcmd_index.setdefault(func_name, subcmd_attrs)
+                    rename_match = _RENAME_PAT.search(subcmd_attrs)
+                    if rename_match:
+                        subcmd_index.setdefault(rename_match.group(1), subcmd_attrs)
                 
-                # Parse each subcommand function in the same file
+                command_subcommands = command['subcommands'] = {}
                 for subcmd_name in subcommands:
-                    subcmd_pattern = rf'#\[poise::command\((.*?)\)\].*?pub async fn {re.escape(subcmd_name)}\('
-                    subcmd_match = re.search(subcmd_pattern, content, re.DOTALL)
-                    if subcmd_match:
-                        subcmd_attrs = subcmd_match.group(1)
-                        
+                    subcmd_attrs = subcmd_index.get(subcmd_name)
+                    if subcmd_attrs is not None:
                         # Parse subcommand description
-                        subcmd_desc_match = re.search(r'description_localized.*?"en-US".*?"([^"]+)"', subcmd_attrs)
-                        if not subcmd_desc_match:
-                            subcmd_desc_match = re.search(r'description\s*=\s*"([^"]+)"', subcmd_attrs)
-                        
-                        subcmd_description = subcmd_desc_match.group(1) if subcmd_desc_match else ''
+                        subcmd_description = _parse_attrs(subcmd_attrs).description
                         
                         # Parse subcommand parameters (simplified)
                         subcmd_params = []
+                        
+                        command_subcommands[subcmd_name] = {
+                            'description': subcmd_description,
+                            'parameters': subcmd_params
+                        }
+                    else:
+                        # Fallback: create with empty description
+                        command_subcommands[subcmd_name] = {
+                            'description': '',
+                            'parameters': []
+                        }
             
-            # Parse aliases
-            aliases = []
-            aliases_match = re.search(r'aliases\s*\(\s*([^)]+)\s*\)', attrs)
-            if aliases_match:
-                aliases_text = aliases_match.group(1)
-                aliases = [a.strip().strip('"').strip("'") for a in aliases_text.split(',')]
-            
-            # Check if command supports prefix commands
-            supports_prefix = 'prefix_command' in attrs
-            supports_slash = 'slash_command' in attrs
+            if parsed.aliases:
+                command['aliases'] = list(parsed.aliases)
             
-            # Update or create command info
-            if cmd_name in self.commands:
-                self.commands[cmd_name]['description'] = desc_match.group(1) if desc_match else ''
-                if subcommands:
-                    self.commands[cmd_name]['subcommands'] = {}
-                    for subcmd_name in subcommands:
-                        # Look for function with rename = "subcmd_name" or function name matching subcmd_name
-                        subcmd_pattern = rf'#\[poise::command\((.*?)\)\].*?pub async fn (\w+)\('
-                        subcmd_matches = list(re.finditer(subcmd_pattern, content, re.DOTALL))
-                        
-                        subcmd_found = False
-                        for subcmd_match in subcmd_matches:
-                            subcmd_attrs, func_name = subcmd_match.groups()
-                            
-                            # Check if this function is renamed to our subcmd_name
-                            rename_match = re.search(rf'rename\s*=\s*"{re.escape(subcmd_name)}"', subcmd_attrs)
-                            if rename_match or func_name == subcmd_name:
-                                # Parse subcommand description
-                                subcmd_desc_match = re.search(r'description_localized.*?"en-US".*?"([^"]+)"', subcmd_attrs)
-                                if not subcmd_desc_match:
-                                    subcmd_desc_match = re.search(r'description\s*=\s*"([^"]+)"', subcmd_attrs)
-                                
-                                subcmd_description = subcmd_desc_match.group(1) if subcmd_desc_match else ''
-                                
-                                # Parse subcommand parameters (simplified)
-                                subcmd_params = []
-                                
-                                self.commands[cmd_name]['subcommands'][subcmd_name] = {
-                                    'description': subcmd_description,
-                                    'parameters': subcmd_params
-                                }
-                                subcmd_found = True
-                                break
-                        
-                        if not subcmd_found:
-                            # Fallback: create with empty description
-                            self.commands[cmd_name]['subcommands'][subcmd_name] = {
-                                'description': '',
-                                'parameters': []
-                            }
-                
-                if aliases:
-                    self.commands[cmd_name]['aliases'] = aliases
-                
-                # Add command support flags
-                self.commands[cmd_name]['supports_prefix'] = supports_prefix
-                self.commands[cmd_name]['supports_slash'] = supports_slash
+            # Add command support flags
+            command['supports_prefix'] = parsed.supports_prefix
+            command['supports_slash'] = parsed.supports_slash
     
-    def save_to_json(self, output_path: str = "test_results/discovered_commands.json"):
-        """Save discovered commands to JSON file."""
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w') as f:
-            json.dump(self.commands, f, indent=2)
+    def save_to_json(self, output_path: str = "test_results/discovered_commands.json", pretty: bool = False):
+        """Save discovered commands to JSON file (compact unless pretty is set)."""
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            data = orjson.dumps(self.commands, option=orjson.OPT_INDENT_2 if pretty else 0)
+        else:
+            dump_kwargs = {'indent': 2} if pretty else {'separators': (',', ':')}
+            data = json.dumps(self.commands, **dump_kwargs).encode('utf-8')
+        output_file.write_bytes(data)
         return output_path
 
 def main():
@@ -5,81 +5,27 @@ Advanced HTML report generator for test results with interactive features.
 
 import json
 import os
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from operator import attrgetter
+from html import escape as _esc
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 import base64
+import heapq
+import io
+import time
+from collections import Counter, defaultdict
 
-class HTMLReportGenerator:
-    """Generates comprehensive HTML reports with charts and interactivity."""
-    
-    def __init__(self, persistence=None):
-        self.persistence = persistence
-        self.template_dir = Path(__file__).parent / "templates"
-        
-    def generate_report(self, output_path: Optional[str] = None, 
-                       title: str = "Command Test Report", 
-                       auto_open: bool = False) -> str:
-        """Generate comprehensive HTML report."""
-        if not output_path:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = f"test_results/report_{timestamp}.html"
-        
-        # Clean up old reports before generating new one
-        self._cleanup_old_reports()
-        
-        # Get data from persistence layer
-        if self.persistence:
-            results = self.persistence.get_all_test_results()
-            stats = self.persistence.get_statistics()
-        else:
-            # Fallback to JSON if no persistence
-            results = self._load_json_results()
-            stats = self._calculate_stats(results)
-        
-        # Generate HTML
-        html = self._generate_html(results, stats, title)
-        
-        # Save report
-        with open(output_path, 'w') as f:
-            f.write(html)
-        
-        # Get absolute path for better compatibility
-        abs_path = os.path.abspath(output_path)
-        
-        # Automatically open the report if requested
-        if auto_open:
-            self._open_report(abs_path)
-        
-        return abs_path
-    
-    def _generate_html(self, results: List[Dict], stats: Dict, title: str) -> str:
-        """Generate the full HTML report."""
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    {self._get_styles()}
-    {self._get_scripts()}
-</head>
-<body>
-    <div class="container">
-        {self._generate_header(title)}
-        {self._generate_summary(stats)}
-        {self._generate_charts(stats)}
-        {self._generate_filters()}
-        {self._generate_results_table(results)}
-        {self._generate_timeline(results)}
-        {self._generate_footer()}
-    </div>
-</body>
-</html>"""
-    
-    def _get_styles(self) -> str:
-        """Get CSS styles for the report."""
-        return """
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib decoder
+    orjson = None
+
+# Static report assets, built once at import rather than per report
+_HEAD_PRELOADS = '<link rel="preload" as="script" href="https://cdn.jsdelivr.net/npm/chart.js">'
+_CSS_STYLES = """
     <style>
         :root {
             --bg-primary: #0e0e10;
@@ -227,6 +173,9 @@ class HTMLReportGenerator:
             border-radius: 8px;
             margin: 2rem 0;
             overflow: hidden;
+            /* Skip layout and paint for command sections scrolled off screen */
+            content-visibility: auto;
+            contain-intrinsic-size: auto 300px;
         }
         
         .collapsible-header {
@@ -423,6 +372,10 @@ class HTMLReportGenerator:
             border-color: var(--accent);
         }
         
+        .hidden {
+            display: none;
+        }
+        
         @media (max-width: 768px) {
             .summary-grid {
                 grid-template-columns: 1fr;
@@ -446,11 +399,9 @@ class HTMLReportGenerator:
             }
         }
     </style>"""
-    
-    def _get_scripts(self) -> str:
-        """Get JavaScript for interactivity."""
-        return """
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+
+_JS_SCRIPTS = """
+    <script defer src="https://cdn.jsdelivr.net/npm/chart.js"></script>
     <script>
         // Collapsible functionality
         function toggleCollapse(element) {
@@ -470,36 +421,62 @@ class HTMLReportGenerator:
             });
         }
         
+        // Result rows with their enclosing sections, collected once
+        let filterRows = null;
+        let filterSections = null;
+        
+        function getFilterRows() {
+            if (!filterRows) {
+                filterSections = new Set();
+                filterRows = Array.from(document.querySelectorAll('.results-table tbody tr'), row => {
+                    const sections = [];
+                    let section = row.closest('.collapsible-section');
+                    while (section) {
+                        sections.push(section);
+                        filterSections.add(section);
+                        section = section.parentElement.closest('.collapsible-section');
+                    }
+                    return { row, sections };
+                });
+            }
+            return filterRows;
+        }
+        
         // Filter functionality for collapsible structure
         function filterResults() {
             const searchInput = document.getElementById('searchInput').value.toLowerCase();
             const statusFilter = document.getElementById('statusFilter').value;
+            const rows = getFilterRows();
+            const visibleBySection = new Map();
+            let visibleCount = 0;
             
-            // Filter individual rows in tables
-            document.querySelectorAll('.results-table tbody tr').forEach(row => {
-                const command = row.cells[0].textContent.toLowerCase();
-                const status = row.querySelector('.status-badge')?.textContent.toLowerCase() || '';
-                
-                const matchesSearch = command.includes(searchInput);
-                const matchesStatus = statusFilter === 'all' || status.includes(statusFilter);
+            // Filter individual rows, counting visible rows per section as we go
+            rows.forEach(({ row, sections }) => {
+                const matchesSearch = (row.dataset.cmdLc || '').includes(searchInput);
+                const matchesStatus = statusFilter === 'all' || row.dataset.status === statusFilter;
+                const visible = matchesSearch && matchesStatus;
                 
-                row.style.display = matchesSearch && matchesStatus ? '' : 'none';
+                row.classList.toggle('hidden', !visible);
+                if (visible) {
+                    visibleCount++;
+                    sections.forEach(section => {
+                        visibleBySection.set(section, (visibleBySection.get(section) || 0) + 1);
+                    });
+                }
             });
             
             // Hide empty sections
-            document.querySelectorAll('.collapsible-section').forEach(section => {
-                const visibleRows = section.querySelectorAll('tbody tr:not([style*="display: none"])');
-                section.style.display = visibleRows.length > 0 ? '' : 'none';
+            filterSections.forEach(section => {
+                section.classList.toggle('hidden', !visibleBySection.has(section));
             });
             
-            updateVisibleCount();
+            updateVisibleCount(visibleCount);
         }
         
-        function updateVisibleCount() {
-            const visibleRows = document.querySelectorAll('.results-table tbody tr:not([style*="display: none"])');
+        function updateVisibleCount(count) {
             const countElement = document.getElementById('visibleCount');
             if (countElement) {
-                countElement.textContent = visibleRows.length;
+                countElement.textContent = count;
             }
         }
         
@@ -520,7 +497,7 @@ class HTMLReportGenerator:
         
         // Export functionality
         function exportToCSV() {
-            const rows = document.querySelectorAll('.results-table tr:not([style*="display: none"])');
+            const rows = document.querySelectorAll('.results-table tr:not(.hidden)');
             let csv = [];
             
             // Add headers
@@ -551,7 +528,11 @@ class HTMLReportGenerator:
             initCharts();
             
             // Add event listeners
-            document.getElementById('searchInput')?.addEventListener('input', filterResults);
+            let filterTimer;
+            document.getElementById('searchInput')?.addEventListener('input', () => {
+                clearTimeout(filterTimer);
+                filterTimer = setTimeout(filterResults, 100);
+            });
             document.getElementById('statusFilter')?.addEventListener('change', filterResults);
             document.getElementById('exportBtn')?.addEventListener('click', exportToCSV);
             document.getElementById('expandAllBtn')?.addEventListener('click', expandAll);
@@ -565,7 +546,7 @@ class HTMLReportGenerator:
             });
             
             // Initial count
-            updateVisibleCount();
+            updateVisibleCount(getFilterRows().length);
         });
         
         function initCharts() {
@@ -630,19 +611,421 @@ class HTMLReportGenerator:
             }
         }
     </script>"""
-    
-    def _generate_header(self, title: str) -> str:
-        """Generate report header."""
-        return f"""
+
+# Document skeleton around the title and the body sections
+_HTML_DOC_OPEN = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>"""
+_HTML_HEAD_REST = f"""</title>
+    {_HEAD_PRELOADS}
+    {_CSS_STYLES}
+    {_JS_SCRIPTS}
+</head>
+<body>
+    <div class="container">
+        """
+_HTML_SECTION_SEP = "\n        "
+_HTML_DOC_CLOSE = """
+    </div>
+</body>
+</html>"""
+
+# Buffer size for streaming the report to disk
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Minimum seconds between old-report cleanups on one generator
+_CLEANUP_INTERVAL = 60.0
+
+# JSON fallback inputs, and the sidecar recording which inputs built the last report
+_STATUS_JSON_PATH = "test_results/universal_test_status.json"
+_DISCOVERED_JSON_PATH = "test_results/discovered_commands.json"
+_REPORT_SIG_PATH = "test_results/.report_sig.json"
+
+# Results table heading, which is also all an empty run renders
+_RESULTS_HEADING_HTML = '<h2>📋 Test Results</h2>'
+_EMPTY_RESULTS_HTML = _RESULTS_HEADING_HTML
+
+# Static fragments of the results table; each one starts on a new line
+_CMD_SECTION_OPEN = """
+
+            <div class="collapsible-section collapsible-container">
+                <div class="collapsible-header command-level">
+                    <div style="display: flex; align-items: center;">
+                        <span class="collapse-icon">▼</span>
+                        <span class="command-name">/"""
+_CMD_SECTION_TOTAL = """</span>
+                    </div>
+                    <div class="command-stats">
+                        <span class="mini-stat">Total: """
+_CMD_SECTION_PASSED = """</span>
+                        <span class="mini-stat" style="color: var(--success);">✅ """
+_CMD_SECTION_FAILED = """</span>
+                        <span class="mini-stat" style="color: var(--danger);">❌ """
+_CMD_SECTION_TABLE = """</span>
+                    </div>
+                </div>
+                <div class="collapsible-content">
+            
+
+                <table class="results-table">
+                    <thead>
+                        <tr>
+                            <th>Subcommand</th>
+                            <th>Description</th>
+                            <th>Status</th>
+                            <th>Last Tested</th>
+                            <th>Notes</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+            """
+_CMD_SECTION_CLOSE = """
+
+                    </tbody>
+                </table>
+                </div>
+            </div>
+            """
+_GROUP_SECTION_OPEN = """
+
+                    </tbody>
+                    </table>
+                    
+                    <div class="collapsible-section" style="margin-left: 2rem; margin-top: 0.5rem;">
+                        <div class="collapsible-header group-level" onclick="toggleCollapse(this)">
+                            <div style="display: flex; align-items: center;">
+                                <span class="collapse-icon">▼</span>
+                                <span class="command-name" style="color: var(--accent);">/"""
+_GROUP_SECTION_TOTAL = """</span>
+                            </div>
+                            <div class="command-stats">
+                                <span class="mini-stat">Total: """
+_GROUP_SECTION_PASSED = """</span>
+                                <span class="mini-stat" style="color: var(--success);">✅ """
+_GROUP_SECTION_FAILED = """</span>
+                                <span class="mini-stat" style="color: var(--danger);">❌ """
+_GROUP_SECTION_TABLE = """</span>
+                            </div>
+                        </div>
+                        <div class="collapsible-content">
+                            <table class="results-table">
+                                <tbody>
+                    """
+_GROUP_SECTION_CLOSE = """
+
+                                </tbody>
+                            </table>
+                        </div>
+                    </div>
+                    
+                    <table class="results-table">
+                        <tbody>
+                    """
+
+
+# Report header; takes the escaped title and the generation timestamp
+_HEADER_HTML = """
         <div class="header">
-            <h1>🚀 {title}</h1>
-            <p class="timestamp">Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <h1>🚀 %s</h1>
+            <p class="timestamp">Generated: %s</p>
+        </div>"""
+
+# Static filter bar, expand/collapse buttons and footer
+_FILTERS_HTML = """
+        <div class="filters">
+            <div class="filter-group">
+                <label for="searchInput">Search:</label>
+                <input type="text" id="searchInput" placeholder="Filter commands...">
+            </div>
+            <div class="filter-group">
+                <label for="statusFilter">Status:</label>
+                <select id="statusFilter">
+                    <option value="all">All</option>
+                    <option value="passed">Passed</option>
+                    <option value="failed">Failed</option>
+                    <option value="partial">Partial</option>
+                    <option value="untested">Untested</option>
+                    <option value="skipped">Skipped</option>
+                    <option value="rejected">Rejected</option>
+                </select>
+            </div>
+            <div class="filter-group">
+                <span>Showing: <strong id="visibleCount">0</strong> results</span>
+            </div>
+            <button class="btn" id="exportBtn">📥 Export CSV</button>
+        </div>"""
+_EXPAND_CONTROLS_HTML = """
+        <div class="expand-controls">
+            <button class="expand-btn" id="expandAllBtn">➕ Expand All</button>
+            <button class="expand-btn" id="collapseAllBtn">➖ Collapse All</button>
+        </div>"""
+_FILTERS_SECTION_HTML = _FILTERS_HTML + _EXPAND_CONTROLS_HTML
+_FOOTER_HTML = """
+        <div class="footer">
+            <p>Generated by Universal Command Testing System</p>
+            <p>© 2024 - Powered by Python & SQLite</p>
         </div>"""
+
+# Status chart container; the one hole takes the JSON status distribution
+_CHARTS_HTML = """
+        <div class="chart-container">
+            <h2>📊 Status Distribution</h2>
+            <div style="height: 300px;">
+                <canvas id="statusChart"></canvas>
+            </div>
+        </div>
+        <script>
+            window.statusData = %s;
+        </script>"""
+
+
+# Activity timeline wrapper around the per-test items
+_TIMELINE_OPEN = """
+        <div class="timeline">
+            <h2>📅 Recent Activity</h2>
+            """
+_TIMELINE_CLOSE = """
+        </div>"""
+# One timeline entry: command, status (class and label) and timestamp
+_TIMELINE_ITEM_HTML = """
+            <div class="timeline-item">
+                <span class="command-name">%s</span>
+                <span style="margin: 0 1rem;">→</span>
+                <span class="status-badge status-%s">%s</span>
+                <span style="margin-left: auto;" class="timestamp">%s</span>
+            </div>"""
+
+# One results-table row: lowercased name and status for the filter, padding
+# style, name, description, status (class and label), timestamp and notes,
+# all already escaped
+_ROW_HTML = """
+        <tr data-cmd-lc="%s" data-status="%s">
+            <td class="command-name" style="%s">%s</td>
+            <td>%s</td>
+            <td><span class="status-badge status-%s">%s</span></td>
+            <td class="timestamp">%s</td>
+            <td class="notes">%s</td>
+        </tr>"""
+
+
+# Name-cell padding for subcommand rows and for rows nested inside a group
+_PADDING_SUB = 'padding-left: 1.5rem;'
+_PADDING_NESTED = 'padding-left: 3rem;'
+
+
+def _clip_esc(text: Optional[str], limit: int) -> str:
+    """Truncate ``text`` to ``limit`` characters, then HTML-escape it."""
+    return _esc(text[:limit]) if text else ''
+
+
+@dataclass
+class Row:
+    """One test result as rendered in the report.
+    
+    ``notes`` and ``description`` are display-only, so they are clipped and
+    HTML-escaped once on construction; the other fields stay raw because they
+    drive grouping and stats.
+    """
+    # Declared by hand rather than with dataclass(slots=True), which needs
+    # Python 3.10; slotted fields can't have class-level defaults, so the
+    # hierarchy attributes are set in __post_init__ instead
+    __slots__ = ('command', 'subcommand', 'status', 'tested_at', 'notes',
+                 'description', 'display_name', 'padding')
+    
+    command: str
+    subcommand: Optional[str]
+    status: str
+    tested_at: str
+    notes: str
+    description: str
+    
+    def __post_init__(self):
+        self.notes = _clip_esc(self.notes, 100)
+        self.description = _clip_esc(self.description, 60)
+        # Label and name-cell padding for the row's place in the hierarchy,
+        # set while bucketing
+        self.display_name = ''
+        self.padding = ''
+    
+    @classmethod
+    def from_dict(cls, result: Dict) -> 'Row':
+        """Build a row from a persistence result dict, filling in missing fields."""
+        return cls(
+            result.get('command', ''),
+            result.get('subcommand', ''),
+            result.get('status', 'untested'),
+            result.get('tested_at', 'Never'),
+            result.get('notes', ''),
+            result.get('description', ''),
+        )
+
+
+# Parsed JSON inputs keyed by path, as (st_mtime_ns, st_size, data)
+_JSON_CACHE: Dict[str, tuple] = {}
+
+
+def _load_json_cached(path: str) -> Any:
+    """Load a JSON file, reusing the parsed data while its mtime and size are unchanged.
+
+    The returned object is shared between calls and must not be mutated.
+    """
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _JSON_CACHE.get(path)
+    if hit is not None and hit[:2] == key:
+        return hit[2]
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    _JSON_CACHE[path] = (*key, data)
+    return data
+
+
+def _parse_tested_at(tested_at: str) -> datetime:
+    """Parse an ISO timestamp, accepting a trailing 'Z' before Python 3.11 did."""
+    if tested_at.endswith('Z'):
+        tested_at = tested_at[:-1] + '+00:00'
+    return datetime.fromisoformat(tested_at)
+
+
+@lru_cache(maxsize=1024)
+def _format_tested_at(tested_at: str) -> str:
+    """Format an ISO timestamp for display, returning it unchanged if unparseable."""
+    try:
+        return _parse_tested_at(tested_at).strftime('%Y-%m-%d %H:%M')
+    except (AttributeError, ValueError):
+        return tested_at
+
+
+def _result_sort_key(result: Row) -> tuple:
+    """Order results by command, then subcommand, treating missing values as empty."""
+    return (result.command or '', result.subcommand or '')
+
+
+def _new_command_entry() -> Dict[str, Any]:
+    """Empty results-table bucket for one top-level command."""
+    return {'_self': None, 'groups': {}, 'direct_subs': [], 'counts': Counter()}
+
+
+def _group_entry(cmd_data: Dict[str, Any], group_name: str) -> Dict[str, Any]:
+    """Return the bucket for ``group_name`` under ``cmd_data``, creating it if needed."""
+    groups = cmd_data['groups']
+    return groups.get(group_name) or groups.setdefault(group_name, {'_self': None, 'items': [], 'counts': Counter()})
+
+
+class HTMLReportGenerator:
+    """Generates comprehensive HTML reports with charts and interactivity."""
+    
+    def __init__(self, persistence=None):
+        self.persistence = persistence
+        self.template_dir = Path(__file__).parent / "templates"
+        self._last_cleanup: Optional[float] = None
+        
+    def generate_report(self, output_path: Optional[str] = None, 
+                       title: str = "Command Test Report", 
+                       auto_open: bool = False) -> str:
+        """Generate comprehensive HTML report."""
+        # Without persistence the report is built from the JSON inputs and the
+        # title, plus the clock through the last-24h count. An unchanged
+        # signature reuses the last report until a counted test ages out of
+        # that window; the reused header keeps its original "Generated" time.
+        signature = None
+        if not self.persistence:
+            signature = self._report_signature(title)
+            cached_path = self._cached_report_path(signature, output_path)
+            if cached_path:
+                if auto_open:
+                    self._open_report(cached_path)
+                return cached_path
+        
+        now = datetime.now()
+        if not output_path:
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
+            output_path = f"test_results/report_{timestamp}.html"
+        
+        # Clean up old reports before generating new one, at most once per interval
+        started = time.monotonic()
+        if self._last_cleanup is None or started - self._last_cleanup > _CLEANUP_INTERVAL:
+            self._cleanup_old_reports()
+            self._last_cleanup = started
+        
+        # Get data from persistence layer
+        if self.persistence:
+            results = [Row.from_dict(r) for r in self.persistence.get_all_test_results()]
+            stats = self.persistence.get_statistics()
+        else:
+            # Fallback to JSON if no persistence
+            results = self._load_json_results()
+            stats, valid_until = self._calculate_stats_with_expiry(results)
+        
+        # Generate HTML and stream it to disk section by section, encoding
+        # each fragment once into a large binary buffer
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            write = f.write
+            for chunk in self._iter_html(results, stats, title, now):
+                write(chunk.encode('utf-8'))
+        
+        # Get absolute path for better compatibility
+        abs_path = os.path.abspath(output_path)
+        
+        if signature is not None:
+            self._save_report_signature(signature, abs_path, valid_until)
+        
+        # Automatically open the report if requested
+        if auto_open:
+            self._open_report(abs_path)
+        
+        return abs_path
+    
+    def _generate_html(self, results: List[Row], stats: Dict, title: str,
+                       now: Optional[datetime] = None) -> str:
+        """Generate the full HTML report."""
+        return ''.join(self._iter_html(results, stats, title, now))
+    
+    def _iter_html(self, results: List[Row], stats: Dict, title: str,
+                   now: Optional[datetime] = None) -> Iterator[str]:
+        """Yield the HTML report as a sequence of fragments."""
+        title = _esc(title)
+        yield _HTML_DOC_OPEN
+        yield title
+        yield _HTML_HEAD_REST
+        yield self._generate_header(title, now)
+        yield _HTML_SECTION_SEP
+        yield self._generate_summary(stats)
+        yield _HTML_SECTION_SEP
+        yield self._generate_charts(stats)
+        yield _HTML_SECTION_SEP
+        yield self._generate_filters()
+        yield _HTML_SECTION_SEP
+        yield self._generate_results_table(results)
+        yield _HTML_SECTION_SEP
+        yield self._generate_timeline(results)
+        yield _HTML_SECTION_SEP
+        yield self._generate_footer()
+        yield _HTML_DOC_CLOSE
+    
+    def _get_styles(self) -> str:
+        """Get CSS styles for the report."""
+        return _CSS_STYLES
+    
+    def _get_scripts(self) -> str:
+        """Get JavaScript for interactivity."""
+        return _JS_SCRIPTS
+    
+    def _generate_header(self, title: str, now: Optional[datetime] = None) -> str:
+        """Generate report header; ``title`` must already be HTML-escaped."""
+        generated_at = (now or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        return _HEADER_HTML % (title, generated_at)
     
     def _generate_summary(self, stats: Dict) -> str:
         """Generate summary statistics cards."""
-        total = sum(stats.get('status_distribution', {}).values())
-        passed = stats.get('status_distribution', {}).get('passed', 0)
+        status_dist = stats.get('status_distribution') or {}
+        total = sum(status_dist.values())
+        passed = status_dist.get('passed', 0)
         coverage = (passed * 100 // total) if total > 0 else 0
         
         return f"""
@@ -673,412 +1056,375 @@ class HTMLReportGenerator:
         status_dist = stats.get('status_distribution', {})
         
         # Prepare data for JavaScript
-        status_data = json.dumps(status_dist)
+        status_data = json.dumps(status_dist, separators=(',', ':'))
         
-        return f"""
-        <div class="chart-container">
-            <h2>📊 Status Distribution</h2>
-            <div style="height: 300px;">
-                <canvas id="statusChart"></canvas>
-            </div>
-        </div>
-        <script>
-            window.statusData = {status_data};
-        </script>"""
+        return _CHARTS_HTML % status_data
     
     def _generate_filters(self) -> str:
         """Generate filter controls."""
-        return """
-        <div class="filters">
-            <div class="filter-group">
-                <label for="searchInput">Search:</label>
-                <input type="text" id="searchInput" placeholder="Filter commands...">
-            </div>
-            <div class="filter-group">
-                <label for="statusFilter">Status:</label>
-                <select id="statusFilter">
-                    <option value="all">All</option>
-                    <option value="passed">Passed</option>
-                    <option value="failed">Failed</option>
-                    <option value="partial">Partial</option>
-                    <option value="untested">Untested</option>
-                    <option value="skipped">Skipped</option>
-                    <option value="rejected">Rejected</option>
-                </select>
-            </div>
-            <div class="filter-group">
-                <span>Showing: <strong id="visibleCount">0</strong> results</span>
-            </div>
-            <button class="btn" id="exportBtn">📥 Export CSV</button>
-        </div>
-        <div class="expand-controls">
-            <button class="expand-btn" id="expandAllBtn">➕ Expand All</button>
-            <button class="expand-btn" id="collapseAllBtn">➖ Collapse All</button>
-        </div>"""
+        return _FILTERS_SECTION_HTML
     
-    def _generate_results_table(self, results: List[Dict]) -> str:
+    def _generate_results_table(self, results: List[Row]) -> str:
         """Generate the main results table with collapsible hierarchy."""
-        from collections import defaultdict
+        if not results:
+            return _EMPTY_RESULTS_HTML
+        
+        # Sort once so every bucket below is filled in display order
+        results = sorted(results, key=_result_sort_key)
         
         # Organize results by command and subcommand groups
-        command_structure = defaultdict(lambda: {'_self': None, 'groups': defaultdict(lambda: {'_self': None, 'items': []}), 'direct_subs': []})
+        command_structure = {}
         
+        # Group names per command, i.e. the first word of every spaced subcommand
+        group_prefixes = defaultdict(set)
         for result in results:
-            command = result.get('command', '')
-            subcommand = result.get('subcommand', '')
+            subcommand = result.subcommand
+            if subcommand and ' ' in subcommand:
+                group_prefixes[result.command].add(subcommand.split(' ', 1)[0])
+        
+        for result in results:
+            command = result.command
+            subcommand = result.subcommand
+            status = result.status
+            cmd_data = command_structure.get(command) or command_structure.setdefault(command, _new_command_entry())
             
             if not subcommand or subcommand == '_self':
-                # Base command
-                command_structure[command]['_self'] = result
+                # Base command; a later duplicate replaces the earlier one
+                previous = cmd_data['_self']
+                if previous:
+                    cmd_data['counts'][previous.status] -= 1
+                cmd_data['_self'] = result
+                cmd_data['counts'][status] += 1
+                result.display_name = '(base command)'
+                result.padding = ''
             else:
                 # Check if subcommand has a space (indicates a group)
                 parts = subcommand.split(' ', 1)
                 if len(parts) > 1:
                     # Subcommand group with nested item
                     group_name = parts[0]
-                    sub_name = parts[1]
-                    result['sub_name'] = sub_name
-                    result['full_subcommand'] = subcommand
-                    command_structure[command]['groups'][group_name]['items'].append(result)
+                    result.display_name = parts[1]
+                    result.padding = _PADDING_NESTED
+                    group_data = _group_entry(cmd_data, group_name)
+                    group_data['items'].append(result)
+                    group_data['counts'][status] += 1
+                    cmd_data['counts'][status] += 1
                 else:
                     # Could be either a direct subcommand or a group parent
                     # Check if this appears as a group name in any other results
-                    is_group_parent = any(
-                        r.get('subcommand', '') and r.get('subcommand', '').startswith(f"{subcommand} ")
-                        for r in results
-                        if r.get('command') == command
-                    )
-                    
-                    if is_group_parent:
+                    if subcommand in group_prefixes.get(command, ()):
                         # This is a group parent command (like "filter" or "award")
-                        command_structure[command]['groups'][subcommand]['_self'] = result
+                        group_data = _group_entry(cmd_data, subcommand)
+                        previous = group_data['_self']
+                        if previous:
+                            group_data['counts'][previous.status] -= 1
+                            cmd_data['counts'][previous.status] -= 1
+                        group_data['_self'] = result
+                        group_data['counts'][status] += 1
+                        cmd_data['counts'][status] += 1
+                        result.display_name = f'{subcommand} (group parent)'
+                        result.padding = _PADDING_SUB
                     else:
                         # Direct subcommand
-                        command_structure[command]['direct_subs'].append(result)
+                        cmd_data['direct_subs'].append(result)
+                        cmd_data['counts'][status] += 1
+                        result.display_name = subcommand
+                        result.padding = _PADDING_SUB
         
-        html_sections = ['<h2>📋 Test Results</h2>']
+        out = io.StringIO()
+        write = out.write
+        write(_RESULTS_HEADING_HTML)
         
         # Generate HTML for each command
-        for cmd_name in sorted(command_structure.keys()):
-            cmd_data = command_structure[cmd_name]
+        for cmd_name, cmd_data in command_structure.items():
+            cmd_label = _esc(cmd_name)
             
-            # Calculate stats for this command
-            all_results = []
-            if cmd_data['_self']:
-                all_results.append(cmd_data['_self'])
-            all_results.extend(cmd_data['direct_subs'])
-            for group_data in cmd_data['groups'].values():
-                if group_data['_self']:
-                    all_results.append(group_data['_self'])
-                all_results.extend(group_data['items'])
-            
-            total = len(all_results)
-            passed = sum(1 for r in all_results if r.get('status') == 'passed')
-            failed = sum(1 for r in all_results if r.get('status') == 'failed')
+            # Stats for this command were tallied while bucketing
+            status_counts = cmd_data['counts']
+            total = sum(status_counts.values())
+            passed = status_counts['passed']
+            failed = status_counts['failed']
             
-            # Command-level collapsible section
-            html_sections.append(f'''
-            <div class="collapsible-section collapsible-container">
-                <div class="collapsible-header command-level">
-                    <div style="display: flex; align-items: center;">
-                        <span class="collapse-icon">▼</span>
-                        <span class="command-name">/{cmd_name}</span>
-                    </div>
-                    <div class="command-stats">
-                        <span class="mini-stat">Total: {total}</span>
-                        <span class="mini-stat" style="color: var(--success);">✅ {passed}</span>
-                        <span class="mini-stat" style="color: var(--danger);">❌ {failed}</span>
-                    </div>
-                </div>
-                <div class="collapsible-content">
-            ''')
-            
-            # Start table for this command
-            html_sections.append('''
-                <table class="results-table">
-                    <thead>
-                        <tr>
-                            <th>Subcommand</th>
-                            <th>Description</th>
-                            <th>Status</th>
-                            <th>Last Tested</th>
-                            <th>Notes</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            ''')
+            # Command-level collapsible section and the start of its table
+            write(_CMD_SECTION_OPEN)
+            write(cmd_label)
+            write(_CMD_SECTION_TOTAL)
+            write(str(total))
+            write(_CMD_SECTION_PASSED)
+            write(str(passed))
+            write(_CMD_SECTION_FAILED)
+            write(str(failed))
+            write(_CMD_SECTION_TABLE)
             
             # Add base command if exists
             if cmd_data['_self']:
-                html_sections.append(self._generate_row(cmd_data['_self'], is_base=True))
+                write('\n')
+                write(self._generate_row(cmd_data['_self']))
             
             # Add direct subcommands
-            for sub_result in sorted(cmd_data['direct_subs'], key=lambda x: x.get('subcommand', '')):
-                html_sections.append(self._generate_row(sub_result))
+            for sub_result in cmd_data['direct_subs']:
+                write('\n')
+                write(self._generate_row(sub_result))
             
             # Add grouped subcommands
-            for group_name in sorted(cmd_data['groups'].keys()):
-                group_data = cmd_data['groups'][group_name]
+            for group_name, group_data in cmd_data['groups'].items():
                 if group_data['_self'] or group_data['items']:
-                    # Calculate group stats
-                    group_items = group_data['items']
-                    if group_data['_self']:
-                        group_items = [group_data['_self']] + group_items
-                    
-                    group_total = len(group_items)
-                    group_passed = sum(1 for r in group_items if r.get('status') == 'passed')
-                    group_failed = sum(1 for r in group_items if r.get('status') == 'failed')
+                    # Group stats
+                    group_counts = group_data['counts']
+                    group_total = sum(group_counts.values())
+                    group_passed = group_counts['passed']
+                    group_failed = group_counts['failed']
                     
                     # Add collapsible group section
-                    html_sections.append(f'''
-                    </tbody>
-                    </table>
-                    
-                    <div class="collapsible-section" style="margin-left: 2rem; margin-top: 0.5rem;">
-                        <div class="collapsible-header group-level" onclick="toggleCollapse(this)">
-                            <div style="display: flex; align-items: center;">
-                                <span class="collapse-icon">▼</span>
-                                <span class="command-name" style="color: var(--accent);">/{cmd_name} {group_name}</span>
-                            </div>
-                            <div class="command-stats">
-                                <span class="mini-stat">Total: {group_total}</span>
-                                <span class="mini-stat" style="color: var(--success);">✅ {group_passed}</span>
-                                <span class="mini-stat" style="color: var(--danger);">❌ {group_failed}</span>
-                            </div>
-                        </div>
-                        <div class="collapsible-content">
-                            <table class="results-table">
-                                <tbody>
-                    ''')
+                    write(_GROUP_SECTION_OPEN)
+                    write(cmd_label)
+                    write(' ')
+                    write(_esc(group_name))
+                    write(_GROUP_SECTION_TOTAL)
+                    write(str(group_total))
+                    write(_GROUP_SECTION_PASSED)
+                    write(str(group_passed))
+                    write(_GROUP_SECTION_FAILED)
+                    write(str(group_failed))
+                    write(_GROUP_SECTION_TABLE)
                     
                     # Add the group parent command if it exists
                     if group_data['_self']:
-                        html_sections.append(self._generate_row(group_data['_self'], is_group_parent=True))
+                        write('\n')
+                        write(self._generate_row(group_data['_self']))
                     
                     # Add subcommands in this group
-                    for sub_result in sorted(group_data['items'], key=lambda x: x.get('sub_name', '')):
-                        html_sections.append(self._generate_row(sub_result, indent=True))
-                    
-                    html_sections.append('''
-                                </tbody>
-                            </table>
-                        </div>
-                    </div>
+                    for sub_result in group_data['items']:
+                        write('\n')
+                        write(self._generate_row(sub_result))
                     
-                    <table class="results-table">
-                        <tbody>
-                    ''')
+                    write(_GROUP_SECTION_CLOSE)
             
             # Close table and section
-            html_sections.append('''
-                    </tbody>
-                </table>
-                </div>
-            </div>
-            ''')
+            write(_CMD_SECTION_CLOSE)
         
-        return '\n'.join(html_sections)
+        return out.getvalue()
     
-    def _generate_row(self, result: Dict, is_base: bool = False, is_group_parent: bool = False, indent: bool = False) -> str:
-        """Generate a single table row for a test result."""
-        command = result.get('command', '')
-        subcommand = result.get('subcommand', '')
-        
-        # Format the display name
-        if is_base:
-            display_name = '(base command)'
-        elif is_group_parent:
-            display_name = f'{subcommand} (group parent)'
-        elif 'sub_name' in result:
-            display_name = result['sub_name']
-        else:
-            display_name = subcommand or '(base)'
+    def _generate_row(self, result: Row) -> str:
+        """Generate a single table row for a bucketed test result."""
+        display_name = result.display_name
         
-        status = result.get('status', 'untested')
-        tested_at = result.get('tested_at', 'Never')
+        status = result.status
+        tested_at = result.tested_at
         if tested_at != 'Never':
-            try:
-                dt = datetime.fromisoformat(tested_at.replace('Z', '+00:00'))
-                tested_at = dt.strftime('%Y-%m-%d %H:%M')
-            except:
-                pass
-        
-        notes = result.get('notes', '')
-        description = result.get('description', '')
+            tested_at = _format_tested_at(tested_at)
         
-        # Apply indentation if needed
-        padding = 'padding-left: 3rem;' if indent else 'padding-left: 1.5rem;' if not is_base else ''
+        notes = result.notes
+        description = result.description
         
         # Add fallback for empty descriptions
-        desc_display = description[:60] if description.strip() else "No description available"
-        
-        return f'''
-        <tr>
-            <td class="command-name" style="{padding}">{display_name}</td>
-            <td>{desc_display}</td>
-            <td><span class="status-badge status-{status}">{status}</span></td>
-            <td class="timestamp">{tested_at}</td>
-            <td class="notes">{notes[:100]}</td>
-        </tr>'''
+        desc_display = description if description.strip() else "No description available"
+        
+        # Escape the remaining dynamic fields; notes and description already are
+        status = str(status)
+        name_lc = _esc(display_name.lower())
+        status_lc = _esc(status.lower())
+        display_name = _esc(display_name)
+        status = _esc(status)
+        tested_at = _esc(str(tested_at))
+        
+        return _ROW_HTML % (name_lc, status_lc, result.padding, display_name, desc_display,
+                            status, status, tested_at, notes)
     
-    def _generate_timeline(self, results: List[Dict]) -> str:
+    def _generate_timeline(self, results: List[Row]) -> str:
         """Generate activity timeline."""
         # Get recent tests
-        recent = sorted(
-            [r for r in results if r.get('tested_at') and r.get('tested_at') != 'Never'],
-            key=lambda x: x.get('tested_at', ''),
-            reverse=True
-        )[:10]
+        recent = heapq.nlargest(
+            10,
+            (r for r in results if r.tested_at and r.tested_at != 'Never'),
+            key=attrgetter('tested_at'),
+        )
         
         if not recent:
             return ""
         
         items = []
         for result in recent:
-            command = result.get('command', '')
-            subcommand = result.get('subcommand', '')
-            full_command = f"/{command}"
-            if subcommand:
-                full_command += f" {subcommand}"
-            
-            status = result.get('status', 'untested')
-            tested_at = result.get('tested_at', '')
-            
-            items.append(f"""
-            <div class="timeline-item">
-                <span class="command-name">{full_command}</span>
-                <span style="margin: 0 1rem;">→</span>
-                <span class="status-badge status-{status}">{status}</span>
-                <span style="margin-left: auto;" class="timestamp">{tested_at}</span>
-            </div>""")
-        
-        return f"""
-        <div class="timeline">
-            <h2>📅 Recent Activity</h2>
-            {''.join(items)}
-        </div>"""
+            subcommand = result.subcommand
+            full_command = f"/{result.command} {subcommand}" if subcommand else f"/{result.command}"
+            status = _esc(str(result.status))
+            items.append((_esc(full_command), status, status, _esc(_format_tested_at(result.tested_at))))
+        
+        return ''.join((
+            _TIMELINE_OPEN,
+            ''.join(_TIMELINE_ITEM_HTML % item for item in items),
+            _TIMELINE_CLOSE,
+        ))
     
     def _generate_footer(self) -> str:
         """Generate report footer."""
-        return """
-        <div class="footer">
-            <p>Generated by Universal Command Testing System</p>
-            <p>© 2024 - Powered by Python & SQLite</p>
-        </div>"""
+        return _FOOTER_HTML
     
-    def _load_json_results(self) -> List[Dict]:
+    def _load_json_results(self) -> List[Row]:
         """Load results from JSON file (fallback) and integrate with discovered commands."""
-        json_path = "test_results/universal_test_status.json"
-        discovered_path = "test_results/discovered_commands.json"
+        json_path = _STATUS_JSON_PATH
+        discovered_path = _DISCOVERED_JSON_PATH
         
         # Load existing test results
-        test_data = {}
-        if os.path.exists(json_path):
-            with open(json_path, 'r') as f:
-                test_data = json.load(f)
+        try:
+            test_data = _load_json_cached(json_path)
+        except FileNotFoundError:
+            test_data = {}
         
         # Load discovered commands for structure and descriptions
-        discovered_commands = {}
-        if os.path.exists(discovered_path):
-            with open(discovered_path, 'r') as f:
-                discovered_commands = json.load(f)
+        try:
+            discovered_commands = _load_json_cached(discovered_path)
+        except FileNotFoundError:
+            discovered_commands = {}
+        
+        # Flatten discovered descriptions to (command, subcommand) keys, with
+        # None as the subcommand of the base command
+        desc_map = {}
+        for command, cmd_data in discovered_commands.items():
+            desc_map[(command, None)] = cmd_data.get('description', '')
+            for sub_name, sub_data in cmd_data.get('subcommands', {}).items():
+                desc_map[(command, sub_name)] = sub_data.get('description', '')
         
         results = []
         
-        # Process test results first
+        # Process test results first, noting every key they cover; a base
+        # command counts as covered as soon as its command has any test data
+        seen = set()
         for command, content in test_data.items():
+            seen.add((command, None))
             if isinstance(content, dict):
                 for subcommand, info in content.items():
+                    seen.add((command, subcommand))
                     if isinstance(info, dict) and 'status' in info:
-                        # Get description from discovered commands if available
-                        description = ''
-                        if command in discovered_commands:
-                            cmd_data = discovered_commands[command]
-                            if subcommand == '_self' and 'description' in cmd_data:
-                                description = cmd_data['description']
-                            elif 'subcommands' in cmd_data and subcommand in cmd_data['subcommands']:
-                                description = cmd_data['subcommands'][subcommand].get('description', '')
-                        
-                        results.append({
-                            'command': command,
-                            'subcommand': None if subcommand == '_self' else subcommand,
-                            'status': info.get('status', 'untested'),
-                            'tested_at': info.get('last_tested', 'Never'),
-                            'notes': info.get('notes', ''),
-                            'description': description
-                        })
-        
-        # Add missing commands from discovered_commands that aren't in test results yet
-        for command, cmd_data in discovered_commands.items():
-            if command not in test_data:
-                # Add base command if it has description
-                if cmd_data.get('description'):
-                    results.append({
-                        'command': command,
-                        'subcommand': None,
-                        'status': 'untested',
-                        'tested_at': 'Never',
-                        'notes': '',
-                        'description': cmd_data['description']
-                    })
-                
-                # Add all subcommands
-                for sub_name, sub_data in cmd_data.get('subcommands', {}).items():
-                    results.append({
-                        'command': command,
-                        'subcommand': sub_name,
-                        'status': 'untested',
-                        'tested_at': 'Never', 
-                        'notes': '',
-                        'description': sub_data.get('description', '')
-                    })
-            else:
-                # Command exists in test data, add missing subcommands from discovered data
-                existing_subs = set(test_data[command].keys())
-                for sub_name, sub_data in cmd_data.get('subcommands', {}).items():
-                    if sub_name not in existing_subs:
-                        results.append({
-                            'command': command,
-                            'subcommand': sub_name,
-                            'status': 'untested',
-                            'tested_at': 'Never',
-                            'notes': '',
-                            'description': sub_data.get('description', '')
-                        })
+                        key = (command, None if subcommand == '_self' else subcommand)
+                        results.append(Row(
+                            command=command,
+                            subcommand=key[1],
+                            status=info.get('status', 'untested'),
+                            tested_at=info.get('last_tested', 'Never'),
+                            notes=info.get('notes', ''),
+                            description=desc_map.get(key, ''),
+                        ))
+        
+        # Add discovered commands that aren't in test results yet
+        for key, description in desc_map.items():
+            if key in seen or (key[1] is None and not description):
+                continue
+            results.append(Row(
+                command=key[0],
+                subcommand=key[1],
+                status='untested',
+                tested_at='Never',
+                notes='',
+                description=description,
+            ))
         
         return results
     
-    def _calculate_stats(self, results: List[Dict]) -> Dict:
+    def _report_signature(self, title: str) -> List:
+        """Fingerprint the fallback report inputs by title and JSON file mtime/size."""
+        signature = [title]
+        for path in (_STATUS_JSON_PATH, _DISCOVERED_JSON_PATH):
+            try:
+                st = os.stat(path)
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append([st.st_mtime_ns, st.st_size])
+        return signature
+    
+    def _cached_report_path(self, signature: List, output_path: Optional[str]) -> Optional[str]:
+        """Return the last report's path if it was built from ``signature`` and still exists."""
+        try:
+            with open(_REPORT_SIG_PATH, 'rb') as f:
+                cached = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        
+        path = cached.get('path')
+        if cached.get('signature') != signature or not path or not os.path.exists(path):
+            return None
+        valid_until = cached.get('valid_until')
+        if valid_until is not None and time.time() >= valid_until:
+            return None  # The last-24h count has changed since it was built
+        if output_path and os.path.abspath(output_path) != path:
+            return None
+        return path
+    
+    def _save_report_signature(self, signature: List, report_path: str,
+                               valid_until: Optional[float] = None):
+        """Record which inputs produced ``report_path`` and until when (epoch
+        seconds, None for no limit) it stays current, replacing the sidecar
+        atomically."""
+        tmp_path = f"{_REPORT_SIG_PATH}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'signature': signature, 'path': report_path,
+                           'valid_until': valid_until}, f)
+            os.replace(tmp_path, _REPORT_SIG_PATH)
+        except OSError:
+            pass  # The sidecar is only an optimization
+    
+    def _calculate_stats(self, results: List[Row]) -> Dict:
         """Calculate statistics from results."""
-        status_dist = {}
-        for result in results:
-            status = result.get('status', 'untested')
-            status_dist[status] = status_dist.get(status, 0) + 1
-        
-        return {
+        return self._calculate_stats_with_expiry(results)[0]
+    
+    def _calculate_stats_with_expiry(self, results: List[Row]) -> Tuple[Dict, Optional[float]]:
+        """Calculate statistics from results, plus the epoch time at which the
+        first counted test leaves the last-24h window (None if none are counted).
+        """
+        # Tally statuses and timestamps in C; only distinct timestamps get parsed
+        status_dist = Counter(map(attrgetter('status'), results))
+        timestamps = Counter(map(attrgetter('tested_at'), results))
+        
+        recent = 0
+        oldest_recent = None
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+        for tested_at, count in timestamps.items():
+            if tested_at and tested_at != 'Never':
+                try:
+                    dt = _parse_tested_at(tested_at)
+                except (AttributeError, TypeError, ValueError):
+                    continue
+                if dt.tzinfo is None:
+                    dt = dt.astimezone()
+                if dt >= cutoff:
+                    recent += count
+                    if oldest_recent is None or dt < oldest_recent:
+                        oldest_recent = dt
+        
+        stats = {
             'total_commands': len(results),
             'total_tests': len(results),
-            'status_distribution': status_dist,
-            'tests_last_24h': 0
+            'status_distribution': dict(status_dist),
+            'tests_last_24h': recent
         }
+        if oldest_recent is None:
+            return stats, None
+        return stats, (oldest_recent + timedelta(hours=24)).timestamp()
     
     def _cleanup_old_reports(self, max_reports: int = 5):
         """Clean up old HTML reports, keeping only the most recent ones."""
-        import glob
-        
-        # Find all report files
-        report_pattern = "test_results/report_*.html"
-        report_files = glob.glob(report_pattern)
+        # Find all report files, taking mtimes from the directory scan
+        report_files = []
+        try:
+            with os.scandir("test_results") as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('report_') and name.endswith('.html') and entry.is_file():
+                        report_files.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            return
         
         if len(report_files) <= max_reports:
             return  # Nothing to clean up
         
         # Sort by modification time (newest first)
-        report_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
+        report_files.sort(reverse=True)
         
         # Keep only the most recent max_reports files
         files_to_keep = report_files[:max_reports]
-        files_to_delete = report_files[max_reports:]
+        files_to_delete = [path for _, path in report_files[max_reports:]]
         
         # Delete old files
         deleted_count = 0
@@ -1117,11 +1463,11 @@ if __name__ == "__main__":
     # Example usage
     from test_persistence import TestPersistence
     
-    persistence = TestPersistence()
-    generator = HTMLReportGenerator(persistence)
-    
-    report_path = generator.generate_report(
-        title="Discord Bot Command Test Report"
-    )
+    with TestPersistence() as persistence:
+        generator = HTMLReportGenerator(persistence)
+        
+        report_path = generator.generate_report(
+            title="Discord Bot Command Test Report"
+        )
     
     print(f"Report generated: {report_path}")
\ No newline at end of file
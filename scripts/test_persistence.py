@@ -13,6 +13,146 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional
 import hashlib
 import gzip
+import secrets
+import tempfile
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Chunk size for streaming backups through the compressors
+_COPY_BUFFER_SIZE = 1 << 20
+
+# Applied to every connection: WAL lets readers run during writes and, with
+# synchronous=NORMAL, avoids an fsync per commit; the rest keep hot pages and
+# temp b-trees in memory.
+_CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+"""
+
+# SQLite 3.45+ stores JSON columns as binary JSONB, which is read back without
+# re-parsing; older versions keep the text form.
+_JSON_PARAM = "jsonb(?)" if sqlite3.sqlite_version_info >= (3, 45, 0) else "?"
+
+# Ranks each (command, subcommand)'s results newest first; rn = 1 is the
+# latest one, with result_id breaking ties between rows in the same second.
+# A NULL subcommand counts as the base command, as '' does.
+_LATEST_RESULTS_CTE = """
+    WITH latest AS (
+        SELECT r.*,
+               ROW_NUMBER() OVER (
+                   PARTITION BY command, COALESCE(subcommand, '')
+                   ORDER BY tested_at DESC, result_id DESC
+               ) AS rn
+        FROM test_results r
+    )
+"""
+
+# Latest result per tested command, followed by discovered commands that have
+# never been tested (in discovery order); needs temp.discovered to be current.
+# Rows go through _result_dict, which decodes aliases; json() only turns
+# JSONB registry aliases back into text for it.
+_ALL_RESULTS_SQL = """
+    SELECT command, subcommand, status, tested_at, notes,
+           error_output, execution_time_ms, description, aliases
+    FROM (
+        SELECT 
+            r.command, r.subcommand, r.status, r.tested_at, r.notes,
+            r.error_output, r.execution_time_ms,
+            c.description, json(c.aliases) AS aliases,
+            0 AS untested, 0 AS discovered_order
+        FROM latest_test_results r
+        LEFT JOIN command_registry c 
+            ON r.command = c.command AND r.subcommand = c.subcommand
+        UNION ALL
+        SELECT
+            d.command, NULLIF(d.subcommand, ''), 'untested', 'Never', '',
+            NULL, NULL, d.description, d.aliases,
+            1, d.rowid
+        FROM temp.discovered d
+        WHERE NOT EXISTS (
+            SELECT 1 FROM latest_test_results t
+            WHERE t.command = d.command AND t.subcommand = d.subcommand
+        )
+    )
+    ORDER BY untested, discovered_order, command, subcommand
+"""
+
+_ALL_SESSIONS_SQL = "SELECT * FROM test_sessions ORDER BY started_at DESC"
+
+# Per-call statements, built once so the connection's statement cache sees the
+# identical text on every call
+_INSERT_SESSION_SQL = """
+    INSERT INTO test_sessions (session_id, user_id, guild_id, channel_id)
+    VALUES (?, ?, ?, ?)
+"""
+
+_END_SESSION_SQL = """
+    UPDATE test_sessions 
+    SET ended_at = CURRENT_TIMESTAMP 
+    WHERE session_id = ?
+"""
+
+_INSERT_RESULT_SQL = f"""
+    INSERT INTO test_results 
+    (session_id, command, subcommand, status, notes, error_output, execution_time_ms, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, {_JSON_PARAM})
+"""
+
+_UPSERT_REGISTRY_SQL = f"""
+    INSERT OR REPLACE INTO command_registry 
+    (command, subcommand, description, aliases, last_modified)
+    VALUES (?, ?, ?, {_JSON_PARAM}, CURRENT_TIMESTAMP)
+"""
+
+_TEST_STATUS_SQL = """
+    SELECT status, tested_at, notes, error_output, execution_time_ms
+    FROM latest_test_results
+    WHERE command = ? AND subcommand = ?
+"""
+
+
+def _dump_json(obj) -> bytes:
+    """Serialize compactly, with orjson when available; unknown types become str."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, separators=(',', ':')).encode()
+
+
+def _result_dict(row: sqlite3.Row) -> Dict:
+    """Convert an _ALL_RESULTS_SQL row to a get_all_test_results() entry.
+    
+    ``aliases`` is decoded to a list for tested and untested rows alike, and
+    is None for a tested command missing from the registry.
+    """
+    result = dict(row)
+    aliases = result['aliases']
+    if aliases is not None:
+        result['aliases'] = orjson.loads(aliases) if orjson is not None else json.loads(aliases)
+    return result
+
+
+def _write_json_array(f, rows):
+    """Write rows to a binary file as the elements of a JSON array, one per line."""
+    f.write(b'[')
+    for i, row in enumerate(rows):
+        if i:
+            f.write(b',')
+        f.write(b'\n')
+        f.write(_dump_json(dict(row)))
+    f.write(b']')
+
 
 class TestPersistence:
     """Handles all persistence operations for the testing system."""
@@ -26,16 +166,106 @@ class TestPersistence:
         self.backup_dir = self.data_dir / "backups"
         self.backup_dir.mkdir(exist_ok=True)
         
+        # (st_mtime_ns, st_size, parsed data) of discovered_commands.json, and
+        # the (st_mtime_ns, st_size) currently loaded into temp.discovered
+        self._discovered_cache: Optional[tuple] = None
+        self._discovered_loaded: Optional[tuple] = None
+        
+        # test_results row count when ANALYZE last ran; read lazily from
+        # sqlite_stat1 by _refresh_planner_stats
+        self._analyzed_rows: Optional[int] = None
+        
+        # One shared connection; the lock serializes access from any thread
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        
         # Initialize database
         self._init_database()
         
         # Auto-backup on initialization
         self._auto_backup()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database with the tuning PRAGMAs applied."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.executescript(_CONNECTION_PRAGMAS)
+        # Per-connection copy of discovered_commands.json for get_all_test_results
+        conn.execute("""
+            CREATE TEMP TABLE discovered (
+                command TEXT, subcommand TEXT, description TEXT, aliases TEXT
+            )
+        """)
+        return conn
+    
+    def close(self):
+        """Refresh planner statistics if needed and close the shared connection.
+        
+        Safe to call more than once.
+        """
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
+            self._conn = None
+    
+    def __enter__(self) -> 'TestPersistence':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
     def _init_database(self):
         """Initialize SQLite database with proper schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock:
+            with self._conn:
+                self._create_schema(self._conn.cursor())
+            
+            # Let SQLite 3.46+ analyze tables with missing or stale statistics
+            # on open; the growth check below also covers older versions
+            self._conn.execute("PRAGMA optimize=0x10002")
+            self._refresh_planner_stats()
+    
+    def _refresh_planner_stats(self):
+        """Re-run ANALYZE once test_results has more than doubled since its
+        statistics were gathered. Call with the lock held.
+        
+        Runs after every bulk write, so the planner's row estimates never fall
+        more than 2x behind however the instance is used or shut down.
+        """
+        conn = self._conn
+        if self._analyzed_rows is None:
+            self._analyzed_rows = self._read_analyzed_rows()
+        
+        # result_id only grows (nothing deletes results), so it tracks the row
+        # count with a single index probe
+        rows = conn.execute("SELECT MAX(result_id) FROM test_results").fetchone()[0] or 0
+        if rows > 2 * self._analyzed_rows:
+            conn.execute("ANALYZE")
+            conn.commit()
+            self._analyzed_rows = rows
+    
+    def _read_analyzed_rows(self) -> int:
+        """Return test_results' row count as of its last ANALYZE, or 0 if it
+        has no usable sqlite_stat1 entry. Call with the lock held."""
+        conn = self._conn
+        has_stats_table = conn.execute("""
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'
+        """).fetchone()
+        if not has_stats_table:
+            return 0
+        stat = conn.execute("""
+            SELECT stat FROM sqlite_stat1 WHERE tbl = 'test_results' LIMIT 1
+        """).fetchone()
+        # The first number of a sqlite_stat1 entry is the table's row count;
+        # the table is writable, so don't trust its contents
+        try:
+            return int(stat[0].split()[0])
+        except (TypeError, AttributeError, IndexError, ValueError):
+            return 0
+    
+    def _create_schema(self, cursor: sqlite3.Cursor):
+        """Create tables and indexes that do not exist yet."""
         
         # Create tables
         cursor.execute("""
@@ -90,12 +320,64 @@ class TestPersistence:
         """)
         
         # Create indexes for performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_test_results_command ON test_results(command, subcommand)")
+        # Serves "latest result per command" lookups without a sort; it also
+        # covers every (command, subcommand) lookup the old index handled.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_test_results_latest
+            ON test_results(command, subcommand, tested_at DESC, status, execution_time_ms)
+        """)
+        cursor.execute("DROP INDEX IF EXISTS idx_test_results_command")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_test_results_session ON test_results(session_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_test_results_status ON test_results(status)")
         
-        conn.commit()
-        conn.close()
+        # Latest result per (command, subcommand), kept current by a trigger so
+        # reads don't re-derive it from the full history. A WITHOUT ROWID
+        # primary key can't hold NULL, so a NULL subcommand (from the shell
+        # script, manual edits or older data) is stored as ''.
+        backfill = cursor.execute("""
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'latest_test_results'
+        """).fetchone() is None
+        trigger = cursor.execute("""
+            SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_test_results_latest'
+        """).fetchone()
+        if trigger and 'COALESCE' not in trigger[0]:
+            # Created before NULL subcommands were mapped to ''; it aborts on them
+            cursor.execute("DROP TRIGGER trg_test_results_latest")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS latest_test_results (
+                command TEXT NOT NULL,
+                subcommand TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL,
+                tested_at TIMESTAMP,
+                notes TEXT,
+                error_output TEXT,
+                execution_time_ms INTEGER,
+                result_id INTEGER,
+                PRIMARY KEY (command, subcommand)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_test_results_latest
+            AFTER INSERT ON test_results
+            WHEN NOT EXISTS (
+                SELECT 1 FROM latest_test_results
+                WHERE command = NEW.command AND subcommand = COALESCE(NEW.subcommand, '')
+                  AND tested_at > NEW.tested_at
+            )
+            BEGIN
+                INSERT OR REPLACE INTO latest_test_results
+                VALUES (NEW.command, COALESCE(NEW.subcommand, ''), NEW.status, NEW.tested_at, NEW.notes,
+                        NEW.error_output, NEW.execution_time_ms, NEW.result_id);
+            END
+        """)
+        if backfill:
+            cursor.execute(_LATEST_RESULTS_CTE + """
+                INSERT INTO latest_test_results
+                SELECT command, COALESCE(subcommand, ''), status, tested_at, notes,
+                       error_output, execution_time_ms, result_id
+                FROM latest
+                WHERE rn = 1
+            """)
     
     def _auto_backup(self):
         """Automatically backup database if needed."""
@@ -104,25 +386,47 @@ class TestPersistence:
         if not latest_backup or (datetime.now() - latest_backup) > timedelta(hours=24):
             self.create_backup("auto")
     
+    def list_backups(self) -> List[Path]:
+        """List backups in either compression format, newest first."""
+        backups = [*self.backup_dir.glob("*.db.zst"), *self.backup_dir.glob("*.db.gz")]
+        return sorted(backups, key=lambda p: p.stat().st_mtime, reverse=True)
+    
     def _get_latest_backup(self) -> Optional[datetime]:
         """Get timestamp of latest backup."""
-        backups = list(self.backup_dir.glob("*.db.gz"))
+        backups = self.list_backups()
         if not backups:
             return None
         
-        latest = max(backups, key=lambda p: p.stat().st_mtime)
-        return datetime.fromtimestamp(latest.stat().st_mtime)
+        return datetime.fromtimestamp(backups[0].stat().st_mtime)
     
     def create_backup(self, backup_type: str = "manual") -> str:
-        """Create compressed backup of database."""
+        """Create compressed backup of database (zstd, or gzip without zstandard)."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"test_data_{backup_type}_{timestamp}.db.gz"
+        suffix = "zst" if zstandard else "gz"
+        backup_name = f"test_data_{backup_type}_{timestamp}.db.{suffix}"
         backup_path = self.backup_dir / backup_name
         
-        # Compress and save
-        with open(self.db_path, 'rb') as f_in:
-            with gzip.open(backup_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Take a consistent copy with SQLite's online backup API, then
+            # compress it without holding the connection lock
+            snapshot_path = Path(tmp_dir) / "snapshot.db"
+            snapshot = sqlite3.connect(snapshot_path)
+            try:
+                with self._lock:
+                    self._conn.backup(snapshot)
+            finally:
+                snapshot.close()
+            
+            with open(snapshot_path, 'rb') as f_in:
+                if zstandard:
+                    with open(backup_path, 'wb') as f_out:
+                        zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(
+                            f_in, f_out,
+                            read_size=_COPY_BUFFER_SIZE, write_size=_COPY_BUFFER_SIZE
+                        )
+                else:
+                    with gzip.open(backup_path, 'wb') as f_out:
+                        shutil.copyfileobj(f_in, f_out, _COPY_BUFFER_SIZE)
         
         # Clean old backups (keep last 10)
         self._cleanup_old_backups(keep=10)
@@ -131,127 +435,114 @@ class TestPersistence:
     
     def _cleanup_old_backups(self, keep: int = 10):
         """Remove old backups, keeping only the most recent ones."""
-        backups = sorted(self.backup_dir.glob("*.db.gz"), key=lambda p: p.stat().st_mtime)
-        if len(backups) > keep:
-            for backup in backups[:-keep]:
-                backup.unlink()
+        for backup in self.list_backups()[keep:]:
+            backup.unlink()
     
     def restore_backup(self, backup_path: str) -> bool:
         """Restore database from backup."""
         backup_file = Path(backup_path)
         if not backup_file.exists():
             return False
+        is_zstd = backup_file.suffix == ".zst"
+        if is_zstd and zstandard is None:
+            return False
         
         # Create safety backup of current state
         self.create_backup("pre_restore")
         
-        # Restore from backup
-        with gzip.open(backup_file, 'rb') as f_in:
-            with open(self.db_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
+        # Restore from backup; the shared connection is reopened on the new file
+        with self._lock:
+            self._conn.close()
+            if is_zstd:
+                with open(backup_file, 'rb') as f_in, open(self.db_path, 'wb') as f_out:
+                    zstandard.ZstdDecompressor().copy_stream(
+                        f_in, f_out,
+                        read_size=_COPY_BUFFER_SIZE, write_size=_COPY_BUFFER_SIZE
+                    )
+            else:
+                with gzip.open(backup_file, 'rb') as f_in:
+                    with open(self.db_path, 'wb') as f_out:
+                        shutil.copyfileobj(f_in, f_out, _COPY_BUFFER_SIZE)
+            self._conn = self._connect()
+            self._discovered_loaded = None
+            # Backups taken before newer schema changes still need them
+            self._init_database()
         
         return True
     
     def start_session(self, user_id: str, guild_id: str, channel_id: str) -> str:
         """Start a new test session."""
-        session_id = hashlib.sha256(
-            f"{user_id}{guild_id}{channel_id}{datetime.now()}".encode()
-        ).hexdigest()[:16]
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO test_sessions (session_id, user_id, guild_id, channel_id)
-            VALUES (?, ?, ?, ?)
-        """, (session_id, user_id, guild_id, channel_id))
+        session_id = secrets.token_hex(8)
         
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            self._conn.execute(_INSERT_SESSION_SQL, (session_id, user_id, guild_id, channel_id))
         
         return session_id
     
     def end_session(self, session_id: str):
         """End a test session."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE test_sessions 
-            SET ended_at = CURRENT_TIMESTAMP 
-            WHERE session_id = ?
-        """, (session_id,))
-        
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            self._conn.execute(_END_SESSION_SQL, (session_id,))
     
     def record_test(self, session_id: str, command: str, subcommand: Optional[str],
                    status: str, notes: str = "", error_output: str = "",
                    execution_time_ms: int = 0, metadata: Dict = None):
         """Record a test result."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO test_results 
-            (session_id, command, subcommand, status, notes, error_output, execution_time_ms, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            session_id, command, subcommand or "", status, notes, 
+        self._record_tests_bulk(session_id, [(
+            command, subcommand, status, notes,
             error_output, execution_time_ms, json.dumps(metadata or {})
-        ))
-        
-        conn.commit()
-        conn.close()
+        )])
+    
+    def _record_tests_bulk(self, session_id: str, rows: List[tuple]):
+        """Insert many test results in a single transaction.
+        
+        Each row is (command, subcommand, status, notes, error_output,
+        execution_time_ms, metadata_json).
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(_INSERT_RESULT_SQL, (
+                    (session_id, command, subcommand or "", status, notes,
+                     error_output, execution_time_ms, metadata)
+                    for command, subcommand, status, notes, error_output,
+                        execution_time_ms, metadata in rows
+                ))
+            self._refresh_planner_stats()
     
     def update_command_registry(self, commands: Dict[str, Any]):
         """Update the command registry with discovered commands."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        rows = []
         for cmd_name, cmd_info in commands.items():
-            # Update main command
-            cursor.execute("""
-                INSERT OR REPLACE INTO command_registry 
-                (command, subcommand, description, aliases, last_modified)
-                VALUES (?, '', ?, ?, CURRENT_TIMESTAMP)
-            """, (
-                cmd_name, 
+            # Main command
+            rows.append((
+                cmd_name,
+                '',
                 cmd_info.get('description', ''),
                 json.dumps(cmd_info.get('aliases', []))
             ))
             
-            # Update subcommands
+            # Subcommands
             for subcmd_name, subcmd_info in cmd_info.get('subcommands', {}).items():
-                cursor.execute("""
-                    INSERT OR REPLACE INTO command_registry 
-                    (command, subcommand, description, aliases, last_modified)
-                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (
+                rows.append((
                     cmd_name,
                     subcmd_name,
                     subcmd_info.get('description', ''),
                     json.dumps(subcmd_info.get('aliases', []))
                 ))
         
-        conn.commit()
-        conn.close()
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(_UPSERT_REGISTRY_SQL, rows)
+            self._refresh_planner_stats()
     
     def get_test_status(self, command: str, subcommand: Optional[str] = None) -> Dict:
         """Get the latest test status for a command."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT status, tested_at, notes, error_output, execution_time_ms
-            FROM test_results
-            WHERE command = ? AND subcommand = ?
-            ORDER BY tested_at DESC
-            LIMIT 1
-        """, (command, subcommand or ""))
-        
-        result = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            
+            cursor.execute(_TEST_STATUS_SQL, (command, subcommand or ""))
+            
+            result = cursor.fetchone()
         
         if result:
             return {
@@ -265,118 +556,82 @@ class TestPersistence:
     
     def get_all_test_results(self) -> List[Dict]:
         """Get all test results with statistics, integrated with discovered commands."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                r.command, r.subcommand, r.status, r.tested_at, r.notes,
-                r.error_output, r.execution_time_ms,
-                c.description, c.aliases
-            FROM test_results r
-            LEFT JOIN command_registry c 
-                ON r.command = c.command AND r.subcommand = c.subcommand
-            WHERE r.tested_at IN (
-                SELECT MAX(tested_at)
-                FROM test_results
-                GROUP BY command, subcommand
-            )
-            ORDER BY r.command, r.subcommand
-        """)
-        
-        results = []
-        for row in cursor.fetchall():
-            results.append(dict(row))
-        
-        conn.close()
-        
-        # Integrate with discovered commands to include untested commands
-        results = self._integrate_with_discovered_commands(results)
-        
-        return results
+        with self._lock:
+            return self._fetch_all_results(self._conn.cursor())
     
-    def _integrate_with_discovered_commands(self, existing_results: List[Dict]) -> List[Dict]:
-        """Integrate test results with discovered commands to include untested commands."""
-        discovered_path = "test_results/discovered_commands.json"
+    def _fetch_all_results(self, cursor: sqlite3.Cursor) -> List[Dict]:
+        """Run the merged results query on cursor. Call with the lock held."""
+        self._sync_discovered_commands()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute(_ALL_RESULTS_SQL)
+        return [_result_dict(row) for row in cursor.fetchall()]
+    
+    def _sync_discovered_commands(self):
+        """Reload temp.discovered when discovered_commands.json has changed.
         
-        if not os.path.exists(discovered_path):
-            return existing_results
+        Base commands are stored with subcommand '' to match test_results, and
+        only when they have a description. Call with the lock held.
+        """
+        discovered_path = "test_results/discovered_commands.json"
         
         try:
-            with open(discovered_path, 'r') as f:
-                discovered_commands = json.load(f)
+            discovered_commands = self._load_discovered_commands(discovered_path)
+            key = self._discovered_cache[:2]
         except (json.JSONDecodeError, IOError):
-            return existing_results
-        
-        # Create a set of existing command/subcommand pairs
-        existing_pairs = set()
-        for result in existing_results:
-            command = result.get('command', '')
-            subcommand = result.get('subcommand', '')
-            existing_pairs.add((command, subcommand or None))
+            discovered_commands, key = {}, None
+        if key == self._discovered_loaded:
+            return
         
-        # Add missing commands from discovered_commands
+        rows = []
         for command, cmd_data in discovered_commands.items():
-            # Add base command if it doesn't exist and has description
-            if (command, None) not in existing_pairs and cmd_data.get('description'):
-                existing_results.append({
-                    'command': command,
-                    'subcommand': None,
-                    'status': 'untested',
-                    'tested_at': 'Never',
-                    'notes': '',
-                    'description': cmd_data['description'],
-                    'aliases': cmd_data.get('aliases', []),
-                    'error_output': None,
-                    'execution_time_ms': None
-                })
-            
-            # Add all subcommands that don't exist
+            if cmd_data.get('description'):
+                rows.append((command, '', cmd_data['description'],
+                             json.dumps(cmd_data.get('aliases', []), separators=(',', ':'))))
             for sub_name, sub_data in cmd_data.get('subcommands', {}).items():
-                if (command, sub_name) not in existing_pairs:
-                    existing_results.append({
-                        'command': command,
-                        'subcommand': sub_name,
-                        'status': 'untested',
-                        'tested_at': 'Never',
-                        'notes': '',
-                        'description': sub_data.get('description', ''),
-                        'aliases': sub_data.get('aliases', []),
-                        'error_output': None,
-                        'execution_time_ms': None
-                    })
-        
-        return existing_results
+                rows.append((command, sub_name, sub_data.get('description', ''),
+                             json.dumps(sub_data.get('aliases', []), separators=(',', ':'))))
+        
+        with self._conn:
+            self._conn.execute("DELETE FROM temp.discovered")
+            self._conn.executemany("INSERT INTO temp.discovered VALUES (?, ?, ?, ?)", rows)
+        self._discovered_loaded = key
+    
+    def _load_discovered_commands(self, path: str) -> Dict:
+        """Parse the discovered commands file, reusing it while mtime and size are unchanged."""
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        if self._discovered_cache is not None and self._discovered_cache[:2] == key:
+            return self._discovered_cache[2]
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        self._discovered_cache = (*key, data)
+        return data
     
     def get_statistics(self) -> Dict:
         """Get comprehensive test statistics."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Overall statistics
+        with self._lock:
+            return self._fetch_statistics(self._conn.cursor())
+    
+    def _fetch_statistics(self, cursor: sqlite3.Cursor) -> Dict:
+        """Compute get_statistics() on cursor. Call with the lock held."""
+        # Overall statistics; the average is derived from the sum so the
+        # scan only accumulates plain aggregates
         cursor.execute("""
             SELECT 
-                COUNT(DISTINCT command || ':' || subcommand) as total_commands,
                 COUNT(DISTINCT session_id) as total_sessions,
                 COUNT(*) as total_tests,
-                AVG(execution_time_ms) as avg_execution_time
+                SUM(execution_time_ms) as total_execution_time,
+                COUNT(execution_time_ms) as timed_tests
             FROM test_results
         """)
         overall = cursor.fetchone()
         
-        # Status distribution
+        # Status distribution; every (command, subcommand) has exactly one
+        # latest result, so its total is also the number of commands
         cursor.execute("""
             SELECT status, COUNT(*) as count
-            FROM (
-                SELECT command, subcommand, status
-                FROM test_results
-                WHERE tested_at IN (
-                    SELECT MAX(tested_at)
-                    FROM test_results
-                    GROUP BY command, subcommand
-                )
-            )
+            FROM latest_test_results
             GROUP BY status
         """)
         status_dist = {row[0]: row[1] for row in cursor.fetchall()}
@@ -389,77 +644,72 @@ class TestPersistence:
         """)
         recent = cursor.fetchone()
         
-        conn.close()
-        
         return {
-            'total_commands': overall[0] or 0,
-            'total_sessions': overall[1] or 0,
-            'total_tests': overall[2] or 0,
-            'avg_execution_time_ms': overall[3] or 0,
+            'total_commands': sum(status_dist.values()),
+            'total_sessions': overall[0] or 0,
+            'total_tests': overall[1] or 0,
+            'avg_execution_time_ms': overall[2] / overall[3] if overall[3] else 0,
             'status_distribution': status_dist,
             'tests_last_24h': recent[0] if recent else 0
         }
     
     def create_snapshot(self, description: str = "") -> int:
         """Create a snapshot of current test state."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get current state
-        results = self.get_all_test_results()
-        stats = self.get_statistics()
-        
-        snapshot_data = {
-            'timestamp': datetime.now().isoformat(),
-            'results': results,
-            'statistics': stats
-        }
-        
-        # Calculate checksum
-        checksum = hashlib.sha256(
-            json.dumps(snapshot_data, sort_keys=True).encode()
-        ).hexdigest()
-        
-        # Store snapshot
-        cursor.execute("""
-            INSERT INTO test_snapshots (snapshot_data, checksum, description)
-            VALUES (?, ?, ?)
-        """, (json.dumps(snapshot_data), checksum, description))
-        
-        snapshot_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        # Read the state and store the snapshot on one cursor under one lock,
+        # so no write from this instance can land in between
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            snapshot_data = {
+                'timestamp': datetime.now().isoformat(),
+                'results': self._fetch_all_results(cursor),
+                'statistics': self._fetch_statistics(cursor)
+            }
+            
+            # Serialize once; the checksum covers exactly the stored text
+            if orjson is not None:
+                payload = orjson.dumps(snapshot_data, option=orjson.OPT_SORT_KEYS)
+            else:
+                payload = json.dumps(snapshot_data, sort_keys=True).encode()
+            checksum = hashlib.sha256(payload, usedforsecurity=False).hexdigest()
+            
+            # Store snapshot
+            cursor.execute("""
+                INSERT INTO test_snapshots (snapshot_data, checksum, description)
+                VALUES (?, ?, ?)
+            """, (payload.decode(), checksum, description))
         
-        return snapshot_id
+        return cursor.lastrowid
     
     def export_to_json(self, output_path: Optional[str] = None) -> str:
-        """Export all data to JSON format."""
+        """Export all data to JSON format, streaming rows straight from the cursor."""
         if not output_path:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = self.data_dir / f"export_{timestamp}.json"
         
-        export_data = {
-            'exported_at': datetime.now().isoformat(),
-            'results': self.get_all_test_results(),
-            'statistics': self.get_statistics(),
-            'sessions': self._get_all_sessions()
-        }
+        exported_at = datetime.now().isoformat()
+        statistics = self.get_statistics()
         
-        with open(output_path, 'w') as f:
-            json.dump(export_data, f, indent=2, default=str)
+        with self._lock, open(output_path, 'wb', buffering=_COPY_BUFFER_SIZE) as f:
+            self._sync_discovered_commands()
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            f.write(b'{"exported_at":' + _dump_json(exported_at) + b',\n"results":')
+            _write_json_array(f, map(_result_dict, cursor.execute(_ALL_RESULTS_SQL)))
+            f.write(b',\n"statistics":' + _dump_json(statistics) + b',\n"sessions":')
+            _write_json_array(f, cursor.execute(_ALL_SESSIONS_SQL))
+            f.write(b'}\n')
         
         return str(output_path)
     
     def _get_all_sessions(self) -> List[Dict]:
         """Get all test sessions."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM test_sessions ORDER BY started_at DESC")
-        sessions = [dict(row) for row in cursor.fetchall()]
-        
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            
+            cursor.execute(_ALL_SESSIONS_SQL)
+            sessions = [dict(row) for row in cursor.fetchall()]
         return sessions
     
     def migrate_from_json(self, json_path: str) -> bool:
@@ -471,18 +721,21 @@ class TestPersistence:
             # Create a migration session
             session_id = self.start_session("migration", "migration", "migration")
             
-            # Import each test result
+            # Collect every test result, then insert them in one transaction
+            migrated = json.dumps({'migrated': True})
+            rows = []
             for command, content in data.items():
                 if isinstance(content, dict):
                     for subcommand, info in content.items():
                         if isinstance(info, dict) and 'status' in info:
                             subcmd = None if subcommand == '_self' else subcommand
-                            self.record_test(
-                                session_id, command, subcmd,
+                            rows.append((
+                                command, subcmd,
                                 info.get('status', 'untested'),
                                 info.get('notes', ''),
-                                metadata={'migrated': True}
-                            )
+                                "", 0, migrated
+                            ))
+            self._record_tests_bulk(session_id, rows)
             
             self.end_session(session_id)
             return True
@@ -493,16 +746,16 @@ class TestPersistence:
 
 if __name__ == "__main__":
     # Example usage
-    persistence = TestPersistence()
-    
-    # Try to migrate existing data
-    if os.path.exists("test_results/universal_test_status.json"):
-        print("Migrating existing test data...")
-        if persistence.migrate_from_json("test_results/universal_test_status.json"):
-            print("Migration successful!")
+    with TestPersistence() as persistence:
+        # Try to migrate existing data
+        if os.path.exists("test_results/universal_test_status.json"):
+            print("Migrating existing test data...")
+            if persistence.migrate_from_json("test_results/universal_test_status.json"):
+                print("Migration successful!")
+        
+        # Show statistics
+        stats = persistence.get_statistics()
     
-    # Show statistics
-    stats = persistence.get_statistics()
     print(f"\nTest Statistics:")
     print(f"  Total Commands: {stats['total_commands']}")
     print(f"  Total Tests: {stats['total_tests']}")
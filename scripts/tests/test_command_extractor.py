@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Tests for CommandExtractor against small Rust source fixtures.
+
+Run from the repository root:
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from command_extractor import CommandExtractor  # noqa: E402
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+FRAMEWORK_RS = """
+pub fn commands() -> Vec<Command> {
+    let mut commands = vec![
+        role::role(),
+    ];
+    commands
+}
+"""
+
+ROLE_MOD_RS = """
+#[poise::command(prefix_command, description = "Manage roles", subcommands("color", "group", "manage"))]
+pub async fn role(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+"""
+
+# `color` is defined twice; the first definition wins
+COLOR_RS = """
+#[cfg(feature = "colors")]
+#[poise::command(prefix_command, description = "First color", aliases("colour"))]
+pub async fn color(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+
+#[cfg(not(feature = "colors"))]
+#[poise::command(prefix_command, description = "Second color")]
+pub async fn color(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+"""
+
+# The parent entry comes from whichever of `group` and the function with
+# nested subcommands is defined first
+GROUP_RS = """
+#[poise::command(prefix_command, description = "Group by name")]
+pub async fn group(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+
+#[poise::command(prefix_command, description = "Group parent", subcommands("list"))]
+pub async fn group_parent(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+
+#[poise::command(prefix_command, description = "List groups")]
+pub async fn list(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+"""
+
+# A nested subcommand defined twice resolves to its last definition
+MANAGE_RS = """
+#[poise::command(prefix_command, description = "Manage", subcommands("add"))]
+pub async fn manage(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+
+#[poise::command(prefix_command, description = "First add")]
+pub async fn add(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+
+#[poise::command(prefix_command, description = "Second add", aliases("plus"))]
+pub async fn add(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+"""
+
+
+class SubcommandLookupTest(unittest.TestCase):
+    """Subcommand functions resolve in file order, as the original scans did."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        src = Path(self._tmp.name) / 'src'
+        _write(src / 'bot' / 'framework.rs', FRAMEWORK_RS)
+        role_dir = src / 'commands' / 'role'
+        _write(role_dir / 'mod.rs', ROLE_MOD_RS)
+        _write(role_dir / 'color.rs', COLOR_RS)
+        _write(role_dir / 'group.rs', GROUP_RS)
+        _write(role_dir / 'manage.rs', MANAGE_RS)
+
+        self.subcommands = CommandExtractor(str(src)).extract_commands()['role']['subcommands']
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_plain_subcommand_uses_first_definition(self):
+        color = self.subcommands['color']
+        self.assertEqual(color['description'], 'First color')
+        self.assertEqual(color['aliases'], ['colour'])
+
+    def test_parent_subcommand_uses_first_matching_definition(self):
+        self.assertEqual(self.subcommands['group']['description'], 'Group by name')
+        self.assertEqual(self.subcommands['group list']['description'], 'List groups')
+
+    def test_nested_subcommand_uses_last_definition(self):
+        add = self.subcommands['manage add']
+        self.assertEqual(add['description'], 'Second add')
+        self.assertEqual(add['aliases'], ['plus'])
+        self.assertEqual(add['parent_subcommand'], 'manage')
+
+
+# `{` in comments and string literals between the attribute and the fn
+PING_RS = """
+#[poise::command(prefix_command, slash_command, description = "Check latency")]
+/// Replies with the round trip, formatted as `{ms}ms`
+/* Not a body: { */
+#[doc = "Also not a body: {"]
+pub async fn ping(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+"""
+
+TAG_FRAMEWORK_RS = """
+    let mut commands = vec![
+        ping::ping(),
+        tag::tag(),
+    ];
+"""
+
+TAG_MOD_RS = """
+#[poise::command(prefix_command, description = "Tags", aliases("t"), subcommands("show"))]
+// Usage: tag show {name}
+pub async fn tag(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+"""
+
+TAG_SHOW_RS = """
+#[poise::command(prefix_command, description = "Show a tag")]
+/// Prints the tag body, e.g. `{ "text": ... }`
+pub async fn show(ctx: Context<'_>) -> Result<(), Error> {
+    Ok(())
+}
+"""
+
+
+class CommentGapTest(unittest.TestCase):
+    """Comments and strings holding `{` may sit between the attribute and the fn."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        src = Path(self._tmp.name) / 'src'
+        _write(src / 'bot' / 'framework.rs', TAG_FRAMEWORK_RS)
+        _write(src / 'commands' / 'ping.rs', PING_RS)
+        _write(src / 'commands' / 'tag' / 'mod.rs', TAG_MOD_RS)
+        _write(src / 'commands' / 'tag' / 'show.rs', TAG_SHOW_RS)
+
+        self.commands = CommandExtractor(str(src)).extract_commands()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_single_command_file(self):
+        ping = self.commands['ping']
+        self.assertEqual(ping['description'], 'Check latency')
+        self.assertTrue(ping['supports_slash'])
+
+    def test_module_command(self):
+        tag = self.commands['tag']
+        self.assertEqual(tag['description'], 'Tags')
+        self.assertEqual(tag['aliases'], ['t'])
+
+    def test_subcommand_file(self):
+        self.assertEqual(self.commands['tag']['subcommands']['show']['description'], 'Show a tag')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the fallback report cache: HTMLReportGenerator reuses the last
+JSON-built report while its inputs and last-24h count are unchanged.
+
+Run from the repository root:
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import html_generator  # noqa: E402
+from html_generator import HTMLReportGenerator  # noqa: E402
+
+REPORT_PATH = 'test_results/cached_report.html'
+MARKER = b'<!-- not regenerated -->'
+
+
+class FallbackReportCacheTest(unittest.TestCase):
+    """generate_report() without persistence and its signature sidecar."""
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        # The generator reads and writes test_results/ relative to the cwd
+        os.chdir(self._tmp.name)
+        os.mkdir('test_results')
+        # Parsed inputs are cached by relative path, mtime and size
+        html_generator._JSON_CACHE.clear()
+        self.tested_at = datetime.now(timezone.utc) - timedelta(hours=23)
+        self._write_json(html_generator._STATUS_JSON_PATH, {
+            'ping': {'_self': {'status': 'passed', 'notes': '',
+                               'last_tested': self.tested_at.isoformat()}},
+        })
+        self._write_json(html_generator._DISCOVERED_JSON_PATH, {
+            'ping': {'description': 'Check latency', 'subcommands': {}},
+        })
+        self.generator = HTMLReportGenerator()
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _write_json(self, path, data):
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    def _generate_and_mark(self):
+        """Generate the report, then tag it so a rebuild is detectable."""
+        path = self.generator.generate_report(REPORT_PATH)
+        with open(path, 'ab') as f:
+            f.write(MARKER)
+        return path
+
+    def _regenerated(self, first_path):
+        path = self.generator.generate_report(REPORT_PATH)
+        self.assertEqual(path, first_path)
+        with open(path, 'rb') as f:
+            return not f.read().endswith(MARKER)
+
+    def _sidecar(self):
+        with open(html_generator._REPORT_SIG_PATH) as f:
+            return json.load(f)
+
+    def test_sidecar_expires_when_first_counted_test_ages_out(self):
+        path = self._generate_and_mark()
+        sidecar = self._sidecar()
+        self.assertEqual(sidecar['path'], path)
+        expected = (self.tested_at + timedelta(hours=24)).timestamp()
+        self.assertAlmostEqual(sidecar['valid_until'], expected, places=3)
+
+    def test_unchanged_inputs_reuse_report(self):
+        path = self._generate_and_mark()
+        self.assertFalse(self._regenerated(path))
+
+    def test_regenerates_once_valid_until_passes(self):
+        path = self._generate_and_mark()
+        sidecar = self._sidecar()
+        sidecar['valid_until'] = time.time() - 1
+        self._write_json(html_generator._REPORT_SIG_PATH, sidecar)
+
+        self.assertTrue(self._regenerated(path))
+
+    def test_regenerates_when_input_mtime_changes(self):
+        path = self._generate_and_mark()
+        st = os.stat(html_generator._STATUS_JSON_PATH)
+        os.utime(html_generator._STATUS_JSON_PATH,
+                 ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        self.assertTrue(self._regenerated(path))
+
+    def test_no_recent_tests_never_expires(self):
+        self._write_json(html_generator._STATUS_JSON_PATH, {
+            'ping': {'_self': {'status': 'passed', 'notes': '',
+                               'last_tested': '2020-01-01T00:00:00+00:00'}},
+        })
+        path = self._generate_and_mark()
+        self.assertIsNone(self._sidecar()['valid_until'])
+        self.assertFalse(self._regenerated(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Pins the shape of TestPersistence.get_all_test_results() entries and the
+latest-result tracking behind them.
+
+Run from the repository root:
+    python3 -m unittest discover -s scripts/tests
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from test_persistence import TestPersistence  # noqa: E402
+
+RESULT_KEYS = {
+    'command', 'subcommand', 'status', 'tested_at', 'notes',
+    'error_output', 'execution_time_ms', 'description', 'aliases',
+}
+
+DISCOVERED = {
+    'ping': {
+        'description': 'Check latency',
+        'aliases': ['p'],
+        'subcommands': {},
+    },
+    'boosterrole': {
+        'description': 'Manage booster roles',
+        'aliases': ['br', 'booster'],
+        'subcommands': {
+            'color': {'description': 'Set the role color', 'aliases': ['colour']},
+            'award': {'description': 'Award a role'},
+        },
+    },
+}
+
+
+class GetAllTestResultsShapeTest(unittest.TestCase):
+    """get_all_test_results() keeps its per-row types."""
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        # Discovered commands are read from test_results/ relative to the cwd
+        os.chdir(self._tmp.name)
+        os.mkdir('test_results')
+        with open('test_results/discovered_commands.json', 'w') as f:
+            json.dump(DISCOVERED, f)
+
+        self.persistence = TestPersistence('test_results')
+        self.persistence.update_command_registry(DISCOVERED)
+        session_id = self.persistence.start_session('user', 'guild', 'channel')
+        self.persistence.record_test(session_id, 'ping', None, 'passed', 'ok')
+        self.persistence.record_test(session_id, 'boosterrole', 'color', 'failed')
+
+    def tearDown(self):
+        self.persistence.close()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _results(self):
+        return {(r['command'], r['subcommand']): r
+                for r in self.persistence.get_all_test_results()}
+
+    def test_every_row_has_the_same_keys(self):
+        for result in self.persistence.get_all_test_results():
+            self.assertEqual(set(result), RESULT_KEYS)
+
+    def test_tested_rows_come_first_in_command_order(self):
+        keys = [(r['command'], r['subcommand'])
+                for r in self.persistence.get_all_test_results()]
+        self.assertEqual(keys[:2], [('boosterrole', 'color'), ('ping', '')])
+        self.assertEqual(keys[2:], [('boosterrole', None), ('boosterrole', 'award')])
+
+    def test_untested_rows_carry_aliases_as_a_list(self):
+        results = self._results()
+
+        base = results[('boosterrole', None)]
+        self.assertEqual(base['status'], 'untested')
+        self.assertEqual(base['tested_at'], 'Never')
+        self.assertEqual(base['aliases'], ['br', 'booster'])
+        self.assertIsNone(base['error_output'])
+        self.assertIsNone(base['execution_time_ms'])
+
+        self.assertEqual(results[('boosterrole', 'award')]['aliases'], [])
+
+    def test_tested_rows_carry_aliases_as_a_list(self):
+        results = self._results()
+
+        ping = results[('ping', '')]
+        self.assertEqual(ping['status'], 'passed')
+        self.assertEqual(ping['description'], 'Check latency')
+        self.assertEqual(ping['aliases'], ['p'])
+
+        color = results[('boosterrole', 'color')]
+        self.assertEqual(color['aliases'], ['colour'])
+
+    def test_registry_aliases_stored_as_text_are_decoded(self):
+        # As written by json.dumps before aliases were stored as JSONB
+        with self.persistence._conn:
+            self.persistence._conn.execute("""
+                UPDATE command_registry SET aliases = '["p", "pong"]'
+                WHERE command = 'ping' AND subcommand = ''
+            """)
+
+        self.assertEqual(self._results()[('ping', '')]['aliases'], ['p', 'pong'])
+
+    def test_unregistered_tested_rows_have_no_aliases(self):
+        session_id = self.persistence.start_session('user', 'guild', 'channel')
+        self.persistence.record_test(session_id, 'help', None, 'passed')
+
+        help_row = self._results()[('help', '')]
+        self.assertIsNone(help_row['aliases'])
+        self.assertIsNone(help_row['description'])
+
+    def test_export_matches_get_all_test_results(self):
+        path = self.persistence.export_to_json(os.path.join(self._tmp.name, 'export.json'))
+        with open(path) as f:
+            exported = json.load(f)
+        self.assertEqual(exported['results'], self.persistence.get_all_test_results())
+
+
+class NullSubcommandTest(unittest.TestCase):
+    """Rows with a NULL subcommand count as the base command's results."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmp.name) / 'test_results'
+        self.data_dir.mkdir()
+
+        # A database from before latest_test_results existed, holding a
+        # result with a NULL subcommand as the shell script can write
+        conn = sqlite3.connect(self.data_dir / 'test_data.db')
+        conn.executescript("""
+            CREATE TABLE test_results (
+                result_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT,
+                command TEXT NOT NULL,
+                subcommand TEXT,
+                status TEXT NOT NULL,
+                tested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                notes TEXT,
+                error_output TEXT,
+                execution_time_ms INTEGER,
+                metadata JSON
+            );
+            INSERT INTO test_results (command, subcommand, status, tested_at)
+            VALUES ('ping', NULL, 'failed', '2025-09-01 10:00:00');
+        """)
+        conn.close()
+
+        self.persistence = TestPersistence(str(self.data_dir))
+
+    def tearDown(self):
+        self.persistence.close()
+        self._tmp.cleanup()
+
+    def test_open_backfills_null_subcommand_as_base_command(self):
+        self.assertEqual(self.persistence.get_test_status('ping')['status'], 'failed')
+
+    def test_later_null_subcommand_insert_updates_latest(self):
+        conn = sqlite3.connect(self.data_dir / 'test_data.db')
+        with conn:
+            conn.execute("""
+                INSERT INTO test_results (command, subcommand, status, tested_at)
+                VALUES ('ping', NULL, 'passed', '2025-09-02 10:00:00')
+            """)
+        conn.close()
+
+        self.assertEqual(self.persistence.get_test_status('ping')['status'], 'passed')
+
+    def test_record_test_after_null_subcommand_row(self):
+        session_id = self.persistence.start_session('user', 'guild', 'channel')
+        self.persistence.record_test(session_id, 'ping', None, 'passed')
+
+        self.assertEqual(self.persistence.get_test_status('ping')['status'], 'passed')
+        statistics = self.persistence.get_statistics()
+        self.assertEqual(statistics['total_commands'], 1)
+        self.assertEqual(statistics['total_tests'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -51,8 +51,8 @@ init_persistence() {
     # Start new session
     CURRENT_SESSION_ID=$(python3 -c "
 from scripts.test_persistence import TestPersistence
-p = TestPersistence()
-session_id = p.start_session('$TEST_USER_ID', '$TEST_GUILD_ID', '$TEST_CHANNEL_ID')
+with TestPersistence() as p:
+    session_id = p.start_session('$TEST_USER_ID', '$TEST_GUILD_ID', '$TEST_CHANNEL_ID')
 print(session_id)
 ")
     
@@ -77,8 +77,8 @@ from scripts.test_persistence import TestPersistence
 with open('$TEST_DATA_DIR/discovered_commands.json') as f:
     commands = json.load(f)
 
-p = TestPersistence()
-p.update_command_registry(commands)
+with TestPersistence() as p:
+    p.update_command_registry(commands)
 print(f'✅ Updated registry with {len(commands)} commands')
 "
     
@@ -96,15 +96,15 @@ record_test_result() {
     python3 -c "
 from scripts.test_persistence import TestPersistence
 
-p = TestPersistence()
-p.record_test(
-    '$CURRENT_SESSION_ID',
-    '$command',
-    '$subcommand' if '$subcommand' != '_self' else None,
-    '$status',
-    '''$notes''',
-    execution_time_ms=$execution_time
-)
+with TestPersistence() as p:
+    p.record_test(
+        '$CURRENT_SESSION_ID',
+        '$command',
+        '$subcommand' if '$subcommand' != '_self' else None,
+        '$status',
+        '''$notes''',
+        execution_time_ms=$execution_time
+    )
 "
 }
 
@@ -121,9 +121,9 @@ show_dashboard() {
 from scripts.test_persistence import TestPersistence
 from datetime import datetime
 
-p = TestPersistence()
-stats = p.get_statistics()
-results = p.get_all_test_results()
+with TestPersistence() as p:
+    stats = p.get_statistics()
+    results = p.get_all_test_results()
 
 # Display statistics
 print(f"📊 Overall Statistics:")
@@ -211,8 +211,8 @@ test_command_interactive() {
     # Get current test status from database
     local current_status=$(python3 -c "
 from scripts.test_persistence import TestPersistence
-p = TestPersistence()
-result = p.get_test_status('$command', '$subcommand' if '$subcommand' != '_self' else None)
+with TestPersistence() as p:
+    result = p.get_test_status('$command', '$subcommand' if '$subcommand' != '_self' else None)
 print(result.get('status', 'untested'))
 ")
     
@@ -224,8 +224,9 @@ print(result.get('status', 'untested'))
 from scripts.test_persistence import TestPersistence
 import sqlite3
 
-p = TestPersistence()
-conn = sqlite3.connect(p.db_path)
+with TestPersistence() as p:
+    db_path = p.db_path
+conn = sqlite3.connect(db_path)
 cursor = conn.cursor()
 
 cursor.execute('''
@@ -365,9 +366,9 @@ generate_html_report() {
 from scripts.html_generator import HTMLReportGenerator
 from scripts.test_persistence import TestPersistence
 
-p = TestPersistence()
-gen = HTMLReportGenerator(p)
-report_path = gen.generate_report(title='Universal Command Test Report', auto_open=True)
+with TestPersistence() as p:
+    gen = HTMLReportGenerator(p)
+    report_path = gen.generate_report(title='Universal Command Test Report', auto_open=True)
 print(f'✅ Report generated and opened: {report_path}')
 "
     
@@ -387,8 +388,8 @@ from scripts.test_persistence import TestPersistence
 from pathlib import Path
 import os
 
-p = TestPersistence()
-backups = sorted(p.backup_dir.glob('*.db.gz'), key=lambda x: x.stat().st_mtime, reverse=True)
+with TestPersistence() as p:
+    backups = p.list_backups()
 
 print(f'Found {len(backups)} backups:\n')
 for i, backup in enumerate(backups[:10], 1):
@@ -412,8 +413,8 @@ for i, backup in enumerate(backups[:10], 1):
             echo -e "${CYAN}Creating backup...${NC}"
             python3 -c "
 from scripts.test_persistence import TestPersistence
-p = TestPersistence()
-backup_path = p.create_backup('manual')
+with TestPersistence() as p:
+    backup_path = p.create_backup('manual')
 print(f'✅ Backup created: {backup_path}')
 "
             ;;
@@ -423,26 +424,26 @@ print(f'✅ Backup created: {backup_path}')
 from scripts.test_persistence import TestPersistence
 from pathlib import Path
 
-p = TestPersistence()
-backups = sorted(p.backup_dir.glob('*.db.gz'), key=lambda x: x.stat().st_mtime, reverse=True)
-
-try:
-    idx = int('$backup_num') - 1
-    if 0 <= idx < len(backups):
-        if p.restore_backup(str(backups[idx])):
-            print(f'✅ Restored from {backups[idx].name}')
-        else:
-            print('❌ Restore failed')
-except:
-    print('❌ Invalid selection')
+with TestPersistence() as p:
+    backups = p.list_backups()
+    
+    try:
+        idx = int('$backup_num') - 1
+        if 0 <= idx < len(backups):
+            if p.restore_backup(str(backups[idx])):
+                print(f'✅ Restored from {backups[idx].name}')
+            else:
+                print('❌ Restore failed')
+    except:
+        print('❌ Invalid selection')
 "
             ;;
         3)
             echo -e "${CYAN}Exporting to JSON...${NC}"
             python3 -c "
 from scripts.test_persistence import TestPersistence
-p = TestPersistence()
-export_path = p.export_to_json()
+with TestPersistence() as p:
+    export_path = p.export_to_json()
 print(f'✅ Exported to: {export_path}')
 "
             ;;
@@ -450,8 +451,8 @@ print(f'✅ Exported to: {export_path}')
             read -p "Snapshot description: " desc
             python3 -c "
 from scripts.test_persistence import TestPersistence
-p = TestPersistence()
-snapshot_id = p.create_snapshot('$desc')
+with TestPersistence() as p:
+    snapshot_id = p.create_snapshot('$desc')
 print(f'✅ Snapshot created with ID: {snapshot_id}')
 "
             ;;
@@ -489,10 +490,10 @@ subcmds = cmd.get('subcommands', {})
 if subcmds:
     print(f"\nSubcommands ({len(subcmds)}):")
     
-    p = TestPersistence()
+    with TestPersistence() as p:
+        statuses = {name: p.get_test_status('$cmd_name', name) for name in subcmds}
     for i, (name, info) in enumerate(sorted(subcmds.items()), 1):
-        status_info = p.get_test_status('$cmd_name', name)
-        status = status_info.get('status', 'untested')
+        status = statuses[name].get('status', 'untested')
         
         icons = {
             "passed": "✅",
@@ -629,8 +630,8 @@ except:
                     clear
                     python3 -c "
 from scripts.test_persistence import TestPersistence
-p = TestPersistence()
-stats = p.get_statistics()
+with TestPersistence() as p:
+    stats = p.get_statistics()
 print('📊 Detailed Statistics:')
 print(f'  Total Commands: {stats[\"total_commands\"]}')
 print(f'  Total Sessions: {stats[\"total_sessions\"]}')
@@ -648,8 +649,8 @@ for status, count in stats[\"status_distribution\"].items():
                     # End session
                     python3 -c "
 from scripts.test_persistence import TestPersistence
-p = TestPersistence()
-p.end_session('$CURRENT_SESSION_ID')
+with TestPersistence() as p:
+    p.end_session('$CURRENT_SESSION_ID')
 "
                     echo -e "${GREEN}Test session ended. Goodbye!${NC}"
                     exit 0